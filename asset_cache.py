@@ -0,0 +1,166 @@
+# Pre-baked sprite cache.
+#
+# Decoding the PNGs in ASSETS_DIR and rescaling them is most of a cold start
+# on slow kiosks. The bake step does that work once and stores the scaled and
+# vertically flipped variants as raw RGBA buffers in a single cache file,
+# keyed by a hash of the source file and the target height. At startup the
+# file is memory-mapped and surfaces are built straight from the mapped bytes.
+# A changed source file or size, or a damaged cache file, simply misses and
+# gets re-baked.
+#
+#   python asset_cache.py            # bake the game's images ahead of time
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+import pygame
+
+MAGIC = b"PPBAKE01"
+HEADER = struct.Struct("<8sI")  # magic, length of the JSON index that follows
+DEFAULT_CACHE_FILENAME = "sprites.baked"
+
+BakedImage = namedtuple("BakedImage", ["normal", "flipped"])
+
+
+def source_key(path, target_height):
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    return f"{digest}:{target_height}"
+
+
+def scale_to_height(image, target_height):
+    scale = target_height / image.get_height()
+    return pygame.transform.scale(
+        image, (int(image.get_width() * scale), target_height)
+    )
+
+
+def bake(sources, cache_path):
+    # sources: iterable of (image_path, target_height); missing files are
+    # skipped. Returns the keys written.
+    index = {}
+    chunks = []
+    offset = 0
+    for image_path, target_height in sources:
+        if not os.path.exists(image_path):
+            continue
+        scaled = scale_to_height(pygame.image.load(image_path), target_height)
+        flipped = pygame.transform.flip(scaled, False, True)
+        entry = {"size": list(scaled.get_size())}
+        for variant, surface in (("normal", scaled), ("flipped", flipped)):
+            pixels = pygame.image.tobytes(surface, "RGBA")
+            entry[variant] = [offset, len(pixels)]
+            chunks.append(pixels)
+            offset += len(pixels)
+        index[source_key(image_path, target_height)] = entry
+
+    header = json.dumps(index).encode()
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    temporary_path = cache_path + ".tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(header)))
+        f.write(header)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temporary_path, cache_path)  # Readers never see a partial file
+    return list(index)
+
+
+class BakedAssets:
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.index = {}
+        self.buffer = None
+        self.hits = 0
+        self.misses = 0
+        self._file = None
+        self._map = None
+        self._data_start = 0
+        self.open()
+
+    def open(self):
+        self.close()
+        try:
+            self._file = open(self.cache_path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # Missing or empty cache file
+            self.close()
+            return
+        try:
+            magic, header_length = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError("not a baked sprite cache")
+            start = HEADER.size
+            index = json.loads(self._map[start : start + header_length])
+            data_length = len(self._map) - start - header_length
+            for entry in index.values():
+                for offset, length in (entry["normal"], entry["flipped"]):
+                    if offset + length > data_length:
+                        raise ValueError("truncated pixel data")
+        except (struct.error, ValueError, TypeError, KeyError, AttributeError):
+            self.close()  # Damaged: miss everything, so it gets re-baked
+            return
+        self.index = index
+        self._data_start = start + header_length
+        self.buffer = memoryview(self._map)
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.release()
+            self.buffer = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.index = {}
+
+    def get(self, image_path, target_height):
+        # BakedImage for the source file at target_height, or None on a miss.
+        # The surfaces are copies, so the cache can be closed afterwards.
+        if not os.path.exists(image_path):
+            return None
+        entry = self.index.get(source_key(image_path, target_height))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        size = tuple(entry["size"])
+        return BakedImage(
+            self._surface(entry["normal"], size), self._surface(entry["flipped"], size)
+        )
+
+    def _surface(self, location, size):
+        offset, length = location
+        start = self._data_start + offset
+        surface = pygame.image.frombuffer(
+            self.buffer[start : start + length], size, "RGBA"
+        )
+        if pygame.display.get_surface() is not None:
+            return surface.convert_alpha()
+        return surface.copy()
+
+
+def load_baked_or_bake(sources, cache_path):
+    # {image_path: BakedImage} for every existing source, baking the cache
+    # first if any of them is missing or stale
+    cache = BakedAssets(cache_path)
+    images = {path: cache.get(path, height) for path, height in sources}
+    if any(image is None and os.path.exists(path) for path, image in images.items()):
+        cache.close()
+        bake(sources, cache_path)
+        cache = BakedAssets(cache_path)
+        images = {path: cache.get(path, height) for path, height in sources}
+    cache.close()
+    return images
+
+
+if __name__ == "__main__":
+    import game
+
+    written = bake(game.IMAGE_SOURCES, game.BAKED_ASSETS_PATH)
+    print(f"Baked {len(written)} image(s) into {game.BAKED_ASSETS_PATH}")
@@ -0,0 +1,387 @@
+# Monte Carlo difficulty balancer.
+#
+# Runs many seeded headless games with scripted policies for every point of
+# a grid over the difficulty rules (see engine.Rules), spread across a
+# process pool. Work is split into chunks of seeds; each finished chunk is
+# appended to results.jsonl in the output directory as soon as it arrives, so
+# an interrupted sweep resumes where it stopped. summary.json then holds the
+# merged survival curves and score distributions per rules/policy pair.
+#
+#   python balance.py --grid initial_spawn_delay=1400,1700,2000 \
+#       --grid win_score=2000,3000 --games 500 --output balance-out
+#
+# Every grid point plays the same seeds, so differences between points come
+# from the rules rather than from luck of the draw.
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import engine as game_engine
+from settings import NUMBER_LEVEL_BOTTOM_Y, NUMBER_LEVEL_TOP_Y, TICKS_PER_SECOND
+
+RESULTS_FILENAME = "results.jsonl"
+SWEEP_FILENAME = "sweep.json"
+SUMMARY_FILENAME = "summary.json"
+SCORE_BIN = 100
+LOOKAHEAD_PX = 40
+RANDOM_JUMP_CHANCE = 0.02
+DEFAULT_MAX_TICKS = TICKS_PER_SECOND * 600
+
+
+# --- Scripted policies: (engine, rng) -> actions for the next tick ---
+def idle_policy(engine, rng):
+    return ()
+
+
+def random_policy(engine, rng):
+    return (game_engine.JUMP,) if rng.random() < RANDOM_JUMP_CHANCE else ()
+
+
+def resting_lane(engine):
+    # The lane the player sits in when not jumping
+    if engine.player_gravity_direction == 1:
+        return NUMBER_LEVEL_BOTTOM_Y
+    return NUMBER_LEVEL_TOP_Y
+
+
+def next_number(engine):
+    # The closest number ahead of the player, or None
+    player_right = engine.player.rect.right
+    closest = None
+    for lane_y in (NUMBER_LEVEL_TOP_Y, NUMBER_LEVEL_BOTTOM_Y):
+        for sprite in engine.number_lanes.lanes[lane_y]:
+            if sprite.rect.right >= player_right:
+                if closest is None or sprite.rect.left < closest.rect.left:
+                    closest = sprite
+                break
+    return closest
+
+
+def lookahead_policy(engine, rng):
+    # Jump to collect primes in the other lane and to dodge composites in
+    # the resting lane, once the number is about to reach the player
+    number = next_number(engine)
+    if number is None:
+        return ()
+    if not 0 <= number.rect.left - engine.player.rect.right <= LOOKAHEAD_PX:
+        return ()
+    in_resting_lane = number.rect.centery == resting_lane(engine)
+    if in_resting_lane != number.is_prime_val:
+        return (game_engine.JUMP,)
+    return ()
+
+
+def lookahead_flip_policy(engine, rng):
+    # Like lookahead, but spends a flip charge to move to the lane the next
+    # prime is in instead of having to jump for it
+    number = next_number(engine)
+    if (
+        number is not None
+        and engine.has_gravity_flip_charge
+        and number.is_prime_val
+        and number.rect.centery != resting_lane(engine)
+    ):
+        return (game_engine.FLIP,)
+    return lookahead_policy(engine, rng)
+
+
+POLICIES = {
+    "idle": idle_policy,
+    "random": random_policy,
+    "lookahead": lookahead_policy,
+    "lookahead_flip": lookahead_flip_policy,
+}
+
+
+# --- Workers ---
+_engines = {}  # Per-process engines, one per rules point
+
+
+def play_chunk(task):
+    # Plays seeds [start, start + games) for one rules point and policy and
+    # returns only the aggregates, so little crosses the process boundary
+    rules_values, policy_name, start, games, max_ticks = task
+    rules = game_engine.Rules(**rules_values)
+    engine = _engines.get(rules)
+    if engine is None:
+        engine = _engines[rules] = game_engine.Engine(rules=rules)
+    policy = POLICIES[policy_name]
+    deaths = {}  # Second of game over -> games
+    scores = {}  # Score bin -> games
+    wins = 0
+    ticks = 0
+    started = time.perf_counter()
+    for seed in range(start, start + games):
+        engine.reset(seed)
+        rng = random.Random(seed)
+        while engine.running and engine.tick < max_ticks:
+            engine.step(policy(engine, rng))
+        ticks += engine.tick
+        if engine.game_won:
+            wins += 1
+        elif engine.game_over:
+            second = engine.tick // TICKS_PER_SECOND
+            deaths[second] = deaths.get(second, 0) + 1
+        score_bin = engine.score // SCORE_BIN * SCORE_BIN
+        scores[score_bin] = scores.get(score_bin, 0) + 1
+    return {
+        "rules": rules_values,
+        "policy": policy_name,
+        "start": start,
+        "games": games,
+        "wins": wins,
+        "deaths": deaths,
+        "scores": scores,
+        "ticks": ticks,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+# --- Sweep definition ---
+def parse_grid(grid_arguments):
+    # ["win_score=2000,3000", ...] -> {"win_score": [2000, 3000], ...}
+    defaults = game_engine.DEFAULT_RULES._asdict()
+    grid = {name: [value] for name, value in defaults.items()}
+    for argument in grid_arguments or ():
+        name, _, values = argument.partition("=")
+        if name not in defaults:
+            raise ValueError(
+                f"unknown rule {name!r}, expected one of {', '.join(defaults)}"
+            )
+        grid[name] = [parse_rule(defaults[name], value) for value in values.split(",")]
+    return grid
+
+
+def parse_rule(default, text):
+    # Parses text like the rule's default value; None defaults are floats
+    if text.lower() == "none":
+        return None
+    if isinstance(default, bool):
+        return text.lower() in ("1", "true", "yes")
+    if default is None:
+        return float(text)
+    return type(default)(text)
+
+
+def grid_points(grid):
+    points = [{}]
+    for name, values in grid.items():
+        points = [dict(point, **{name: value}) for point in points for value in values]
+    return points
+
+
+def chunk_key(rules_values, policy_name, start):
+    return (json.dumps(rules_values, sort_keys=True), policy_name, start)
+
+
+def make_tasks(sweep):
+    tasks = []
+    for rules_values in grid_points(sweep["grid"]):
+        for policy_name in sweep["policies"]:
+            for start in range(
+                sweep["seed"], sweep["seed"] + sweep["games"], sweep["chunk"]
+            ):
+                games = min(sweep["chunk"], sweep["seed"] + sweep["games"] - start)
+                tasks.append(
+                    (rules_values, policy_name, start, games, sweep["max_ticks"])
+                )
+    return tasks
+
+
+def load_results(path):
+    # Finished chunks; a line cut short by an interrupted run is ignored
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path) as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return results
+
+
+def open_results(path):
+    needs_newline = False
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    results_file = open(path, "a")
+    if needs_newline:
+        results_file.write("\n")  # Start after the truncated line
+    return results_file
+
+
+# --- Aggregation ---
+def summarize(results):
+    merged = {}
+    for result in results:
+        key = (json.dumps(result["rules"], sort_keys=True), result["policy"])
+        entry = merged.setdefault(
+            key,
+            {
+                "rules": result["rules"],
+                "policy": result["policy"],
+                "games": 0,
+                "wins": 0,
+                "ticks": 0,
+                "deaths": {},
+                "scores": {},
+            },
+        )
+        for field in ("games", "wins", "ticks"):
+            entry[field] += result[field]
+        for field in ("deaths", "scores"):
+            for bucket, count in result[field].items():
+                bucket = int(bucket)  # JSON object keys come back as strings
+                entry[field][bucket] = entry[field].get(bucket, 0) + count
+
+    summary = []
+    for entry in merged.values():
+        games = entry["games"]
+        alive = games
+        survival = []  # Fraction of games still running after each second
+        if entry["deaths"]:
+            for second in range(max(entry["deaths"]) + 1):
+                alive -= entry["deaths"].get(second, 0)
+                survival.append(round(alive / games, 4))
+        scores = sorted(entry["scores"].items())
+        summary.append(
+            {
+                "rules": entry["rules"],
+                "policy": entry["policy"],
+                "games": games,
+                "win_rate": entry["wins"] / games,
+                "mean_seconds": entry["ticks"] / games / TICKS_PER_SECOND,
+                "survival": survival,
+                "score_histogram": {str(bucket): count for bucket, count in scores},
+                "score_p50": score_quantile(scores, games, 0.5),
+                "score_p90": score_quantile(scores, games, 0.9),
+            }
+        )
+    summary.sort(key=lambda entry: (json.dumps(entry["rules"]), entry["policy"]))
+    return summary
+
+
+def score_quantile(sorted_bins, games, fraction):
+    # Lower edge of the score bin holding the given fraction of games
+    seen = 0
+    for bucket, count in sorted_bins:
+        seen += count
+        if seen >= fraction * games:
+            return bucket
+    return 0
+
+
+def print_summary(summary, grid):
+    swept = [name for name, values in grid.items() if len(values) > 1]
+    for entry in summary:
+        point = " ".join(f"{name}={entry['rules'][name]}" for name in swept)
+        print(
+            f"{point or 'defaults'} [{entry['policy']}]: "
+            f"{entry['games']} games, win rate {entry['win_rate']:.1%}, "
+            f"score p50 {entry['score_p50']} p90 {entry['score_p90']}, "
+            f"mean {entry['mean_seconds']:.1f} s"
+        )
+
+
+# --- Driver ---
+def run_sweep(sweep, output, workers=None):
+    os.makedirs(output, exist_ok=True)
+    sweep_path = os.path.join(output, SWEEP_FILENAME)
+    if os.path.exists(sweep_path):
+        with open(sweep_path) as f:
+            previous = json.load(f)
+        if previous != sweep:
+            raise ValueError(
+                f"{output} holds a different sweep; use a new output directory"
+            )
+    else:
+        with open(sweep_path, "w") as f:
+            json.dump(sweep, f, indent=2)
+
+    results_path = os.path.join(output, RESULTS_FILENAME)
+    results = load_results(results_path)
+    done = {chunk_key(r["rules"], r["policy"], r["start"]) for r in results}
+    tasks = [task for task in make_tasks(sweep) if chunk_key(*task[:3]) not in done]
+    if results:
+        print(f"Resuming: {len(results)} chunk(s) already done, {len(tasks)} to go")
+
+    started = time.perf_counter()
+    ticks = 0
+    with open_results(results_path) as results_file:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {pool.submit(play_chunk, task) for task in tasks}
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    results_file.write(json.dumps(result) + "\n")
+                    results_file.flush()  # Streamed so a crash loses at most a chunk
+                    results.append(result)
+                    ticks += result["ticks"]
+    elapsed = time.perf_counter() - started
+    if tasks:
+        print(
+            f"Played {sum(task[3] for task in tasks)} games in {elapsed:.1f} s "
+            f"({ticks / max(elapsed, 1e-9):.0f} ticks/s)"
+        )
+
+    summary = summarize(results)
+    with open(os.path.join(output, SUMMARY_FILENAME), "w") as f:
+        json.dump(summary, f, indent=1)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prime Porkour difficulty balancer")
+    parser.add_argument(
+        "--grid",
+        action="append",
+        metavar="RULE=V1,V2",
+        help=f"values to sweep for a rule ({', '.join(game_engine.Rules._fields)})",
+    )
+    parser.add_argument(
+        "--policy",
+        action="append",
+        choices=sorted(POLICIES),
+        help="scripted policy to play with (repeatable, default lookahead)",
+    )
+    parser.add_argument("--games", type=int, default=200, help="games per point")
+    parser.add_argument("--seed", type=int, default=0, help="first game seed")
+    parser.add_argument("--chunk", type=int, default=20, help="games per task")
+    parser.add_argument("--max-ticks", type=int, default=DEFAULT_MAX_TICKS)
+    parser.add_argument("--workers", type=int, help="processes (default: all cores)")
+    parser.add_argument("--output", default="balance-out")
+    options = parser.parse_args(argv)
+
+    try:
+        grid = parse_grid(options.grid)
+    except ValueError as e:
+        parser.error(str(e))
+    sweep = {
+        "grid": grid,
+        "policies": options.policy or ["lookahead"],
+        "games": options.games,
+        "seed": options.seed,
+        "chunk": options.chunk,
+        "max_ticks": options.max_ticks,
+    }
+    try:
+        summary = run_sweep(sweep, options.output, options.workers)
+    except ValueError as e:
+        print(e)
+        return 1
+    print_summary(summary, grid)
+    print(f"Summary written to {os.path.join(options.output, SUMMARY_FILENAME)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+# Benchmarks for the costs that make up a frame.
+#
+# Runs under SDL's dummy video/audio drivers, so it works on CI and kiosks
+# without a screen. Every benchmark reports nanoseconds per operation (best
+# of several repeats) and the results are written as JSON. With --compare the
+# run is checked against a stored result file and exits non-zero if anything
+# got slower than the allowed threshold.
+#
+#   python benchmarks/run_benchmarks.py --output benchmarks/baseline.json
+#   python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Add the parent directory to the Python path to allow importing the game
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+import pygame  # noqa: E402
+
+import engine as game_engine  # noqa: E402
+import primes  # noqa: E402
+import snapshot  # noqa: E402
+from render import DirtyRectRenderer, FullRenderer  # noqa: E402
+from settings import (  # noqa: E402
+    INITIAL_MIN_NUMBER,
+    MAX_NUMBER_CAP,
+    NUMBER_LEVEL_BOTTOM_Y,
+    NUMBER_LEVEL_TOP_Y,
+    NUMBER_SPEED,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+)
+
+ENTITY_COUNTS = (10, 100, 500)
+DEFAULT_THRESHOLD = 0.15  # 15% slower than the baseline counts as a regression
+
+BENCHMARKS = []
+
+
+def benchmark(name, counts=(None,)):
+    # Registers a setup function. setup(count) returns (run, ops): calling
+    # run() performs ops operations.
+    def register(setup):
+        for count in counts:
+            full_name = name if count is None else f"{name}[{count}]"
+            BENCHMARKS.append((full_name, setup, count))
+        return setup
+
+    return register
+
+
+def measure(run, ops, min_time=0.2, repeats=5):
+    # Calibrate the number of calls so a repeat lasts at least min_time
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        calls *= 2
+    best = elapsed
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            run()
+        best = min(best, time.perf_counter() - start)
+    return best / (calls * ops) * 1e9
+
+
+def build_scene(count, seed=0):
+    # An engine with count numbers spread evenly across both lanes
+    engine = game_engine.Engine(seed=seed, prewarm_glyphs=True)
+    rng = random.Random(seed)
+    spacing = (SCREEN_WIDTH + 200) / max(1, count // 2)
+    for i in range(count):
+        lane_y = NUMBER_LEVEL_TOP_Y if i % 2 else NUMBER_LEVEL_BOTTOM_Y
+        value = rng.randint(INITIAL_MIN_NUMBER, engine.current_max_number_limit)
+        x = int((i // 2) * spacing) - 100
+        number = engine.number_pool.acquire(
+            engine.spawner.number_plan(value, lane_y, x)
+        )
+        number.spawn_index = i
+        engine.all_sprites.add(number)
+        engine.numbers_group.add(number)
+        engine.number_lanes.add(number)
+    return engine
+
+
+def wrap_around(engine):
+    # Keep a moving scene on screen without despawning anything. Wrapped
+    # sprites are re-indexed so the lanes stay ordered by rect.right.
+    for sprite in engine.number_lanes.pop_offscreen():
+        sprite.rect.x += SCREEN_WIDTH + 200
+        engine.number_lanes.add(sprite)
+
+
+@benchmark("startup.import_main")
+def bench_startup_import_main(_):
+    # A fresh interpreter per run, so this is cold start plus `import main`
+    command = [sys.executable, "-c", "import main"]
+
+    def run():
+        subprocess.run(command, cwd=ROOT, check=True, capture_output=True)
+
+    return run, 1
+
+
+@benchmark("is_prime.oracle")
+def bench_is_prime_oracle(_):
+    primes.default_oracle.ensure(MAX_NUMBER_CAP)
+    values = range(INITIAL_MIN_NUMBER, MAX_NUMBER_CAP + 1)
+    is_prime = primes.is_prime
+
+    def run():
+        for value in values:
+            is_prime(value)
+
+    return run, len(values)
+
+
+@benchmark("is_prime.miller_rabin")
+def bench_is_prime_miller_rabin(_):
+    values = range(10**9, 10**9 + 500)
+
+    def run():
+        for value in values:
+            primes.miller_rabin(value)
+
+    return run, len(values)
+
+
+@benchmark("number.spawn")
+def bench_number_spawn(_):
+    engine = build_scene(0)
+
+    def run():
+        engine.spawn()
+        for sprite in engine.numbers_group.sprites():
+            engine.number_lanes.discard(sprite)
+            engine.release_number(sprite)
+        for sprite in engine.powerups_group.sprites():
+            engine.powerup_lanes.discard(sprite)
+            engine.release_powerup(sprite)
+
+    return run, 1
+
+
+@benchmark("sprites.update", ENTITY_COUNTS)
+def bench_sprites_update(count):
+    engine = build_scene(count)
+
+    def run():
+        engine.all_sprites.update()
+        wrap_around(engine)
+
+    return run, 1
+
+
+@benchmark("collision.lanes", ENTITY_COUNTS)
+def bench_collision_lanes(count):
+    engine = build_scene(count)
+    player = engine.player
+    collide_mask = pygame.sprite.collide_mask
+
+    def run():
+        for sprite in engine.number_lanes.candidates(player.rect):
+            collide_mask(player, sprite)
+
+    return run, 1
+
+
+@benchmark("collision.spritecollide", ENTITY_COUNTS)
+def bench_collision_spritecollide(count):
+    # The pre-broadphase path, kept as a reference point
+    engine = build_scene(count)
+    player = engine.player
+
+    def run():
+        pygame.sprite.spritecollide(
+            player, engine.numbers_group, False, pygame.sprite.collide_mask
+        )
+
+    return run, 1
+
+
+def frame_benchmark(renderer_class):
+    def setup(count):
+        screen = pygame.display.get_surface()
+        renderer = renderer_class(screen)
+        engine = build_scene(count)
+        hud = [(engine.font.render("Score: 0", True, (0, 0, 0)), (10, 10))]
+
+        def run():
+            engine.all_sprites.update()
+            wrap_around(engine)
+            renderer.draw(engine.all_sprites, hud)
+
+        return run, 1
+
+    return setup
+
+
+benchmark("frame.full", ENTITY_COUNTS)(frame_benchmark(FullRenderer))
+benchmark("frame.dirty", ENTITY_COUNTS)(frame_benchmark(DirtyRectRenderer))
+
+
+def build_array_scene(count, seed=0):
+    # build_scene's numbers, moved into the NumPy store (entities.py)
+    sprite_engine = build_scene(count, seed)
+    engine = game_engine.Engine(seed=seed, entity_store="arrays")
+    for number in sprite_engine.numbers_group:
+        engine.number_store.add(
+            number.value,
+            number.is_prime_val,
+            number.rect.centery,
+            number.rect.x,
+            number.rect.y,
+            number.image,
+            number.mask,
+            getattr(number, "spawn_index", 0),
+        )
+    return engine
+
+
+@benchmark("tick.sprites", ENTITY_COUNTS)
+def bench_tick_sprites(count):
+    # Movement plus broadphase for Number sprites
+    engine = build_scene(count)
+    player_rect = engine.player.rect
+
+    def run():
+        engine.all_sprites.update()
+        wrap_around(engine)
+        engine.number_lanes.candidates(player_rect)
+
+    return run, 1
+
+
+@benchmark("tick.arrays", ENTITY_COUNTS)
+def bench_tick_arrays(count):
+    # The same work on the struct-of-arrays store
+    engine = build_array_scene(count)
+    store = engine.number_store
+    player_rect = engine.player.rect
+
+    def run():
+        engine.all_sprites.update()
+        store.advance(NUMBER_SPEED)
+        n = store.count
+        store.x[:n][store.x[:n] + store.width[:n] < 0] += SCREEN_WIDTH + 200
+        store.overlapping(player_rect)
+
+    return run, 1
+
+
+@benchmark("frame.batch", ENTITY_COUNTS)
+def bench_frame_batch(count):
+    # Array-backed numbers drawn with one Surface.blits call
+    renderer = FullRenderer(pygame.display.get_surface())
+    engine = build_array_scene(count)
+    hud = [(engine.font.render("Score: 0", True, (0, 0, 0)), (10, 10))]
+
+    def run():
+        renderer.draw(
+            engine.all_sprites, hud, batch=engine.number_store.blit_sequence()
+        )
+
+    return run, 1
+
+
+@benchmark("snapshot.capture", ENTITY_COUNTS)
+def bench_snapshot_capture(count):
+    # One tick of rewind history, written into a reused EngineState
+    engine = build_scene(count)
+    state = snapshot.EngineState()
+
+    def run():
+        snapshot.capture(engine, state)
+
+    return run, 1
+
+
+@benchmark("snapshot.restore", ENTITY_COUNTS)
+def bench_snapshot_restore(count):
+    engine = build_scene(count)
+    state = snapshot.capture(engine)
+
+    def run():
+        snapshot.restore(engine, state)
+
+    return run, 1
+
+
+@benchmark("vec_env.step", (1, 64))
+def bench_vec_env_step(count):
+    # One lockstep batch; ops/s is env-steps per second
+    import vec_env  # Optional dependency: NumPy
+
+    env = vec_env.VecEnv(count)
+    env.reset()
+    actions = [0] * count
+
+    def run():
+        env.step(actions)
+
+    return run, count
+
+
+def run_benchmarks(selected=None, min_time=0.2):
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    results = {}
+    for name, setup, count in BENCHMARKS:
+        if selected and not any(name.startswith(prefix) for prefix in selected):
+            continue
+        try:
+            run, ops = setup(count)
+        except ImportError as e:  # Optional dependency missing (NumPy)
+            print(f"{name:32s} skipped: {e}")
+            continue
+        ns_per_op = measure(run, ops, min_time=min_time)
+        results[name] = {"ns_per_op": ns_per_op, "ops_per_sec": 1e9 / ns_per_op}
+        print(f"{name:32s} {ns_per_op:14.0f} ns/op {1e9 / ns_per_op:14.0f} ops/s")
+    pygame.quit()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    # Returns the names of benchmarks that regressed by more than threshold
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        change = result["ns_per_op"] / previous["ns_per_op"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:32s} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prime Porkour benchmarks")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to check against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown before flagging a regression (0.15 = 15%%)",
+    )
+    parser.add_argument(
+        "--only", nargs="*", help="only run benchmarks starting with these names"
+    )
+    parser.add_argument("--min-time", type=float, default=0.2)
+    options = parser.parse_args(argv)
+
+    current = run_benchmarks(options.only, options.min_time)
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(current, f, indent=2)
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, options.threshold)
+        if regressions:
+            print(
+                f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}"
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
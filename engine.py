@@ -0,0 +1,619 @@
+# Headless simulation core for Prime Porkour.
+#
+# The Engine owns every piece of game state and advances it one fixed tick at
+# a time through step(actions). It never touches the display, the mixer or
+# pygame's wall-clock timers, so it can run far faster than real time.
+# main.py drives the same Engine once per frame and turns the events it emits
+# into sounds and log lines.
+import random
+from collections import namedtuple
+
+import pygame
+
+import primes
+from glyphs import GlyphCache
+from lanes import LaneIndex
+from pool import SpritePool
+from spawner import POWERUP, SpawnScheduler
+from settings import (
+    BLACK,
+    CEILING_Y,
+    DIFFICULTY_INCREASE_SCORE_INTERVAL,
+    FONT_SIZE,
+    FRENZY_LANE_YS,
+    FRENZY_SPAWN_DELAY,
+    GROUND_Y,
+    INITIAL_MAX_NUMBER,
+    INITIAL_MIN_NUMBER,
+    INITIAL_SPAWN_DELAY,
+    MAX_NUMBER_CAP,
+    MAX_NUMBER_INCREMENT,
+    MIN_SPAWN_DELAY,
+    NUMBER_LEVEL_BOTTOM_Y,
+    NUMBER_LEVEL_TOP_Y,
+    NUMBER_SPEED,
+    PLAYER_GRAVITY_STRENGTH,
+    PLAYER_JUMP_STRENGTH_DOWN,
+    PLAYER_JUMP_STRENGTH_UP,
+    PLAYER_START_X,
+    POWERUP_SPAWN_CHANCE,
+    POWERUP_SPEED,
+    PRIME_RATIO,
+    PURPLE_POWERUP,
+    RED,
+    SCREEN_WIDTH,
+    SKIP_EASY_COMPOSITES,
+    SPAWN_DELAY_DECREMENT,
+    TICK_MS,
+    WHITE,
+    WIN_SCORE,
+)
+
+# --- Actions accepted by Engine.step ---
+JUMP = "jump"
+FLIP = "flip"
+
+# --- Events emitted by Engine.step ---
+PRIME_COLLECTED = "prime_collected"
+NON_PRIME_COLLECTED = "non_prime_collected"
+PRIME_MISSED = "prime_missed"
+POWERUP_COLLECTED = "powerup_collected"
+GRAVITY_FLIPPED = "gravity_flipped"
+GAME_WON = "game_won"
+DIFFICULTY_UP = "difficulty_up"
+PENALTY = "penalty"  # Frenzy mode: a composite cost its value (value)
+SPAWNED = "spawned"  # value: (number value, or None for a powerup, lane y)
+
+Event = namedtuple("Event", ["kind", "tick", "value"])
+
+# --- Difficulty rules ---
+# The tunable balance knobs, so tools like balance.py can run engines with
+# different values side by side. The defaults are the values in settings.py.
+Rules = namedtuple(
+    "Rules",
+    [
+        "initial_spawn_delay",
+        "spawn_delay_decrement",
+        "max_number_increment",
+        "powerup_spawn_chance",
+        "win_score",
+        "prime_ratio",
+        "skip_easy_composites",
+    ],
+)
+DEFAULT_RULES = Rules(
+    INITIAL_SPAWN_DELAY,
+    SPAWN_DELAY_DECREMENT,
+    MAX_NUMBER_INCREMENT,
+    POWERUP_SPAWN_CHANCE,
+    WIN_SCORE,
+    PRIME_RATIO,
+    SKIP_EASY_COMPOSITES,
+)
+
+
+# --- Classes ---
+PlayerSkin = namedtuple(
+    "PlayerSkin", ["image_normal", "image_flipped", "mask_normal", "mask_flipped"]
+)
+
+
+def make_player_skin(image=None, flipped_image=None):
+    # Both gravity variants of the player and their masks, built once per
+    # engine instead of on every reset and gravity flip. flipped_image can come
+    # pre-baked (see asset_cache.py).
+    if not image:
+        # Create a fallback surface if image loading failed
+        image = pygame.Surface([40, 50])
+        image.fill(RED)
+        flipped_image = None
+    if not flipped_image:
+        flipped_image = pygame.transform.flip(image, False, True)
+    return PlayerSkin(
+        image,
+        flipped_image,
+        pygame.mask.from_surface(image),
+        pygame.mask.from_surface(flipped_image),
+    )
+
+
+class Player(pygame.sprite.Sprite):
+    def __init__(self, engine, skin, *groups):
+        super().__init__(*groups)
+        self.engine = engine
+        self.skin = skin
+        self.original_image_normal = skin.image_normal
+        self.original_image_flipped = skin.image_flipped
+
+        # Set initial image based on gravity
+        self.use_gravity_image()
+
+        self.rect = self.image.get_rect()
+        self.rect.x = PLAYER_START_X
+
+        self.y_float = 0.0
+        # self.set_initial_vertical_pos() will be called from Engine.reset or after gravity flip
+        # but we need a valid rect.y/rect.top/rect.bottom before that for the first placement by group.add
+        if engine.player_gravity_direction == 1:
+            self.rect.bottom = GROUND_Y
+        else:
+            self.rect.top = CEILING_Y
+
+        self.vy = 0
+        self.on_surface = True
+
+    def use_gravity_image(self):
+        if self.engine.player_gravity_direction == 1:
+            self.image = self.skin.image_normal
+            self.mask = self.skin.mask_normal
+        else:
+            self.image = self.skin.image_flipped
+            self.mask = self.skin.mask_flipped
+
+    def set_initial_vertical_pos(self):
+        if self.engine.player_gravity_direction == 1:  # Normal gravity
+            self.y_float = float(GROUND_Y - self.rect.height)
+            self.rect.bottom = GROUND_Y
+        else:  # Reversed gravity
+            self.y_float = float(CEILING_Y)
+            self.rect.top = CEILING_Y
+        self.use_gravity_image()  # Ensure correct image and mask are set
+
+    def attempt_flip_gravity(self):
+        engine = self.engine
+        if engine.has_gravity_flip_charge:
+            engine.player_gravity_direction *= -1
+            if engine.player_gravity_direction == 1:
+                self.y_float = float(GROUND_Y - self.rect.height)
+                self.rect.bottom = GROUND_Y
+            else:
+                self.y_float = float(CEILING_Y)
+                self.rect.top = CEILING_Y
+            self.use_gravity_image()
+            self.vy = 0
+            self.on_surface = True
+            engine.has_gravity_flip_charge = False  # Consume the charge
+            return True
+        return False
+
+    def jump(self):
+        if self.on_surface:
+            if self.engine.player_gravity_direction == 1:  # Normal gravity, jump up
+                self.vy = PLAYER_JUMP_STRENGTH_UP
+            else:  # Reversed gravity, jump "down"
+                self.vy = PLAYER_JUMP_STRENGTH_DOWN
+            self.on_surface = False
+
+    def update(self):
+        gravity_direction = self.engine.player_gravity_direction
+        # Apply player gravity based on direction
+        self.vy += PLAYER_GRAVITY_STRENGTH * gravity_direction
+        self.y_float += self.vy
+        self.rect.y = int(self.y_float)
+
+        # Check for ground/ceiling collision
+        if gravity_direction == 1:  # Normal gravity
+            if self.rect.bottom >= GROUND_Y:
+                self.rect.bottom = GROUND_Y
+                self.y_float = float(self.rect.y)
+                self.vy = 0
+                self.on_surface = True
+        else:  # Reversed gravity
+            if self.rect.top <= CEILING_Y:
+                self.rect.top = CEILING_Y
+                self.y_float = float(self.rect.y)
+                self.vy = 0
+                self.on_surface = True
+
+        # Keep player on screen horizontally (optional)
+        if self.rect.left < 0:
+            self.rect.left = 0
+        if self.rect.right > SCREEN_WIDTH:
+            self.rect.right = SCREEN_WIDTH
+
+
+class Number(pygame.sprite.Sprite):
+    def __init__(self, engine, plan, *groups):
+        super().__init__(*groups)
+        self.engine = engine
+        self.rect = None
+        self.reinit(plan)
+
+    def reinit(self, plan):
+        # (Re)initialise in place so pooled sprites can be recycled. plan is
+        # a spawner.SpawnPlan: value, primality, lane and position are
+        # already decided.
+        self.value = plan.value
+        self.is_prime_val = plan.prime
+        # Shared, cached surface and mask for pixel-perfect collision
+        self.image, self.mask = plan.image, plan.mask
+        if self.rect is None:
+            self.rect = self.image.get_rect()
+        else:
+            self.rect.size = self.image.get_size()
+        self.rect.x = plan.x  # Spawns off-screen right
+        self.rect.top = plan.top
+        self.speed_x = NUMBER_SPEED
+
+    def update(self):
+        self.rect.x -= self.speed_x
+
+    def scrolled_off(self):
+        # Called by the engine once the number has left the screen on the left
+        engine = self.engine
+        if self.is_prime_val and not engine.game_over and not engine.game_won:
+            engine.emit(PRIME_MISSED, self.value)
+            engine.game_over = True
+        self.kill()
+
+
+class GravityFlipPowerUp(pygame.sprite.Sprite):
+    def __init__(self, engine, plan, image=None, *groups):
+        super().__init__(*groups)
+        self.engine = engine
+        if image:
+            self.image = image
+        else:
+            self.image = pygame.Surface([25, 25])
+            self.image.fill(PURPLE_POWERUP)
+            pygame.draw.circle(self.image, WHITE, (12, 12), 8, 2)
+        self.rect = self.image.get_rect()
+        self.mask = pygame.mask.from_surface(self.image)
+        self.reinit(plan)
+
+    def reinit(self, plan):
+        # The image never changes, so recycling only resets the position
+        self.x_float = plan.x  # Store x as float
+        self.rect.x = int(self.x_float)
+        self.rect.centery = plan.lane_y
+        self.speed_x = POWERUP_SPEED
+
+    def update(self):
+        self.x_float -= self.speed_x
+        self.rect.x = int(self.x_float)  # Assign int part to rect.x
+
+    def scrolled_off(self):
+        self.kill()
+
+
+class Engine:
+    # player_image / powerup_image are optional pre-loaded Surfaces, and
+    # player_image_flipped an optional pre-baked upside-down player; without
+    # them the sprites fall back to plain coloured boxes, exactly like the
+    # windowed game does when an asset is missing. With prewarm_glyphs the
+    # glyph cache renders the whole active number range up front, and again
+    # for each newly unlocked range when difficulty rises. rules overrides the
+    # difficulty knobs (see Rules). entity_store="arrays" keeps the scrolling
+    # numbers in NumPy arrays instead of sprites (see entities.py); frenzy
+    # mode needs it.
+    def __init__(
+        self,
+        seed=None,
+        player_image=None,
+        powerup_image=None,
+        font=None,
+        player_image_flipped=None,
+        glyphs=None,
+        prewarm_glyphs=False,
+        rules=DEFAULT_RULES,
+        entity_store="sprites",
+        frenzy=False,
+    ):
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.SysFont(None, FONT_SIZE)
+        self.font = font
+        self.glyphs = glyphs if glyphs is not None else GlyphCache()
+        self.prewarm_glyphs = prewarm_glyphs
+        self.rules = rules
+        self.player_skin = make_player_skin(player_image, player_image_flipped)
+        self.powerup_image = powerup_image
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # --- Sprite Groups ---
+        self.all_sprites = pygame.sprite.Group()
+        self.numbers_group = pygame.sprite.Group()
+        self.powerups_group = pygame.sprite.Group()
+        # Broadphase: per-lane queues ordered by x (see lanes.py)
+        self.number_lanes = LaneIndex([NUMBER_LEVEL_TOP_Y, NUMBER_LEVEL_BOTTOM_Y])
+        self.powerup_lanes = LaneIndex([NUMBER_LEVEL_TOP_Y, NUMBER_LEVEL_BOTTOM_Y])
+        # Despawned sprites are recycled instead of reallocated (see pool.py)
+        self.number_pool = SpritePool(lambda plan: Number(self, plan))
+        self.powerup_pool = SpritePool(
+            lambda plan: GravityFlipPowerUp(self, plan, self.powerup_image)
+        )
+
+        self.frenzy = frenzy
+        self.number_store = None
+        if entity_store == "arrays" or frenzy:
+            from entities import NumberArrays  # Optional dependency: NumPy
+
+            lane_ys = (
+                FRENZY_LANE_YS
+                if frenzy
+                else [NUMBER_LEVEL_TOP_Y, NUMBER_LEVEL_BOTTOM_Y]
+            )
+            self.number_store = NumberArrays(lane_ys)
+
+        # Upcoming spawns, planned ahead (see spawner.py). Call
+        # spawner.start() to have a background thread keep it topped up.
+        self.spawner = SpawnScheduler(self)
+        # Draws numbers with rules.prime_ratio primes; None draws uniformly
+        self.number_sampler = None
+
+        self.events = []
+        self.profiler = None  # Optional profiler.FrameProfiler, lapped per phase
+        self.reset()
+
+    def reset(self, seed=None):
+        with self.spawner.lock:
+            if seed is not None:
+                self.seed = seed
+                self.rng.seed(seed)
+                self.spawner.reset()
+            else:
+                self.spawner.invalidate()  # Unused plans go back to the RNG
+            self.reset_state()
+
+    def reset_state(self):
+        self.score = 0
+        self.game_over = False
+        self.game_won = False
+        self.player_gravity_direction = 1
+        self.has_gravity_flip_charge = False
+        self.current_spawn_delay = (
+            FRENZY_SPAWN_DELAY if self.frenzy else self.rules.initial_spawn_delay
+        )
+        self.current_min_number = INITIAL_MIN_NUMBER
+        self.current_max_number_limit = INITIAL_MAX_NUMBER
+        self.last_difficulty_increase_score = 0
+        primes.default_oracle.ensure(self.current_max_number_limit)
+        if self.rules.prime_ratio is not None:
+            if self.number_sampler is None:
+                self.number_sampler = primes.DensitySampler(
+                    self.current_min_number,
+                    self.current_max_number_limit,
+                    self.rules.prime_ratio,
+                    self.rules.skip_easy_composites,
+                )
+            else:
+                self.number_sampler.truncate(self.current_max_number_limit)
+        if self.prewarm_glyphs:
+            self.warm_glyphs(self.current_min_number, self.current_max_number_limit)
+        # Deterministic replacement for pygame.time.set_timer(SPAWN_EVENT, ...)
+        self.tick = 0
+        self.spawn_timer_ms = 0.0
+        self.spawn_count = 0
+        for number_sprite in self.numbers_group.sprites():
+            self.release_number(number_sprite)
+        for powerup in self.powerups_group.sprites():
+            self.release_powerup(powerup)
+        self.all_sprites.empty()
+        self.numbers_group.empty()
+        self.powerups_group.empty()
+        self.number_lanes.clear()
+        self.powerup_lanes.clear()
+        if self.number_store is not None:
+            self.number_store.clear()
+        self.player = Player(self, self.player_skin)
+        self.player.set_initial_vertical_pos()
+        self.all_sprites.add(self.player)
+        self.events.clear()
+
+    def warm_glyphs(self, low, high):
+        with self.spawner.lock:  # The spawner's thread shares the cache
+            self.glyphs.warm(range(low, high + 1), self.font, BLACK)
+
+    @property
+    def running(self):
+        return not self.game_over and not self.game_won
+
+    def emit(self, kind, value=None):
+        self.events.append(Event(kind, self.tick, value))
+
+    def step(self, actions=()):
+        # Advances the game by one tick and returns the events it produced.
+        # actions is an iterable of JUMP / FLIP, applied in order.
+        self.events.clear()
+        if not self.running:
+            return self.events
+        self.tick += 1
+
+        for action in actions:
+            if action == JUMP:
+                self.player.jump()
+            elif action == FLIP:
+                if self.player.attempt_flip_gravity():
+                    self.emit(GRAVITY_FLIPPED)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.lap("events")
+
+        self.spawn_timer_ms += TICK_MS
+        if self.spawn_timer_ms >= self.current_spawn_delay:
+            self.spawn_timer_ms -= self.current_spawn_delay
+            self.spawn()
+        if profiler is not None:
+            profiler.lap("spawn")
+
+        self.all_sprites.update()
+        if self.number_store is not None:
+            self.number_store.advance(NUMBER_SPEED)
+        self.despawn_offscreen()
+        if profiler is not None:
+            profiler.lap("update")
+        self.check_collisions()
+        if profiler is not None:
+            profiler.lap("collision")
+        if self.running:  # Re-check because collision might have ended game
+            self.update_difficulty()
+        if profiler is not None:
+            profiler.lap("difficulty")
+        return self.events
+
+    def spawn(self):
+        # The RNG rolls, primality test and glyph were done ahead of time
+        self.spawn_count += 1
+        plan = self.spawner.pop(self.has_gravity_flip_charge)
+        if plan.kind == POWERUP:  # Only planned as one if no charge is held
+            new_powerup = self.powerup_pool.acquire(plan)
+            new_powerup.spawn_index = self.spawn_count
+            self.all_sprites.add(new_powerup)
+            self.powerups_group.add(new_powerup)
+            self.powerup_lanes.add(new_powerup)
+        elif self.number_store is not None:
+            self.number_store.add(
+                plan.value,
+                plan.prime,
+                plan.lane_y,
+                plan.x,
+                plan.top,
+                plan.image,
+                plan.mask,
+                self.spawn_count,
+            )
+        else:
+            new_number = self.number_pool.acquire(plan)
+            new_number.spawn_index = self.spawn_count
+            self.all_sprites.add(new_number)
+            self.numbers_group.add(new_number)
+            self.number_lanes.add(new_number)
+        self.emit(SPAWNED, (plan.value, plan.lane_y))
+
+    def despawn_offscreen(self):
+        # Only the front of each lane can have left the screen
+        for number_sprite in self.number_lanes.pop_offscreen():
+            number_sprite.scrolled_off()
+            self.release_number(number_sprite)
+        store = self.number_store
+        if store is not None and store.count:
+            gone = store.offscreen()
+            if len(gone):
+                if not self.frenzy and self.running:
+                    missed = gone[store.prime[gone]]
+                    if len(missed):
+                        self.emit(PRIME_MISSED, int(store.value[missed[0]]))
+                        self.game_over = True
+                store.remove(gone)
+        for powerup in self.powerup_lanes.pop_offscreen():
+            powerup.scrolled_off()
+            self.release_powerup(powerup)
+
+    def release_number(self, number_sprite):
+        number_sprite.kill()
+        self.number_pool.release(number_sprite)
+
+    def release_powerup(self, powerup):
+        powerup.kill()
+        self.powerup_pool.release(powerup)
+
+    def collide(self, lanes, release):
+        # Sprites touching the player, in spawn order, removed from the game.
+        # The lane index narrows the search before the pixel-perfect mask test.
+        player = self.player
+        collided = [
+            sprite
+            for sprite in lanes.candidates(player.rect)
+            if pygame.sprite.collide_mask(player, sprite)
+        ]
+        collided.sort(key=lambda sprite: sprite.spawn_index)
+        for sprite in collided:
+            lanes.discard(sprite)
+            release(sprite)
+        return collided
+
+    def collide_stored(self):
+        # (value, is_prime) of stored numbers touching the player, in spawn
+        # order, removed from the store. Bounding boxes are tested as one
+        # array mask; only those hits get the pixel-perfect mask test.
+        store = self.number_store
+        player = self.player
+        hits = store.overlapping(player.rect)
+        if not len(hits):
+            return []
+        x, y = player.rect.topleft
+        touching = [
+            i
+            for i in hits.tolist()
+            if player.mask.overlap(
+                store.masks[i], (int(store.x[i]) - x, int(store.top[i]) - y)
+            )
+        ]
+        collided = [(int(store.value[i]), bool(store.prime[i])) for i in touching]
+        store.remove(touching)
+        return collided
+
+    def check_collisions(self):
+        # Collision detection using masks for pixel-perfect
+        if self.number_store is not None:
+            collided_numbers = self.collide_stored()
+        else:
+            collided_numbers = [
+                (number_sprite.value, number_sprite.is_prime_val)
+                for number_sprite in self.collide(
+                    self.number_lanes, self.release_number
+                )
+            ]
+        for value, value_is_prime in collided_numbers:
+            if value_is_prime:
+                self.score += value
+                self.emit(PRIME_COLLECTED, value)
+
+                # Check for win condition
+                if self.score >= self.rules.win_score:
+                    self.game_won = True
+                    self.emit(GAME_WON, self.score)
+                    break  # Stop processing further collisions this tick
+            elif self.frenzy and self.score >= value:
+                self.score -= value  # Frenzy forgives composites at a price
+                self.emit(PENALTY, value)
+            else:
+                self.emit(NON_PRIME_COLLECTED, value)
+                self.game_over = True
+                break  # Stop checking collisions if game over
+
+        collided_powerups = self.collide(self.powerup_lanes, self.release_powerup)
+        for _ in collided_powerups:  # Don't care which powerup, only one type for now
+            self.has_gravity_flip_charge = True
+            self.emit(POWERUP_COLLECTED)
+
+    def update_difficulty(self):
+        if (
+            self.score - self.last_difficulty_increase_score
+            >= DIFFICULTY_INCREASE_SCORE_INTERVAL
+        ):
+            self.last_difficulty_increase_score = self.score
+
+            # Increase spawn rate; changing the delay restarts the spawn timer
+            if not self.frenzy:  # Frenzy already spawns every tick
+                self.current_spawn_delay = max(
+                    MIN_SPAWN_DELAY,
+                    self.current_spawn_delay - self.rules.spawn_delay_decrement,
+                )
+                self.spawn_timer_ms = 0.0
+
+            # Increase number range; plans drawn from the old one are void
+            with self.spawner.lock:
+                self.spawner.invalidate()
+                previous_max_number_limit = self.current_max_number_limit
+                self.current_max_number_limit = min(
+                    MAX_NUMBER_CAP,
+                    self.current_max_number_limit + self.rules.max_number_increment,
+                )
+                primes.default_oracle.ensure(self.current_max_number_limit)
+                if self.number_sampler is not None:
+                    self.number_sampler.extend(self.current_max_number_limit)
+                if self.prewarm_glyphs:
+                    self.warm_glyphs(
+                        previous_max_number_limit + 1, self.current_max_number_limit
+                    )
+            self.emit(
+                DIFFICULTY_UP,
+                (
+                    self.current_spawn_delay,
+                    self.current_min_number,
+                    self.current_max_number_limit,
+                ),
+            )
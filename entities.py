@@ -0,0 +1,115 @@
+# Struct-of-arrays store for scrolling numbers.
+#
+# The default engine keeps every Number as a pygame Sprite and moves each one
+# through a Python-level update() call. With hundreds of numbers on screen
+# (frenzy mode) that per-object overhead dominates the tick. NumberArrays
+# keeps positions, sizes, lanes, values and primality in NumPy arrays instead:
+# one vectorised subtraction scrolls every number, off-screen and overlap
+# tests are array masks, and rendering hands the whole batch to one
+# Surface.blits call. Only the glyph surfaces and masks (shared with the
+# glyph cache) stay in plain lists.
+#
+# Needs NumPy, which is an optional dependency: `pip install .[frenzy]`.
+import numpy as np
+
+DEFAULT_CAPACITY = 256
+INT_FIELDS = ("x", "top", "width", "height", "value", "lane", "spawn_index")
+
+
+class NumberArrays:
+    def __init__(self, lane_ys, capacity=DEFAULT_CAPACITY):
+        # lane_ys: the lane centre lines, in the order ties are broken in
+        self.lane_ys = list(lane_ys)
+        self.count = 0
+        self.images = []
+        self.masks = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        old = {name: getattr(self, name, None) for name in (*INT_FIELDS, "prime")}
+        for name in INT_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.int64))
+        self.prime = np.zeros(capacity, dtype=bool)
+        if old["x"] is not None:
+            for name, array in old.items():
+                getattr(self, name)[: self.count] = array[: self.count]
+
+    def __len__(self):
+        return self.count
+
+    def reserve(self, count):
+        # Makes room for count numbers without growing one add() at a time
+        if count > self.capacity:
+            self._allocate(max(count, self.capacity * 2))
+
+    def clear(self):
+        self.count = 0
+        self.images.clear()
+        self.masks.clear()
+
+    def add(self, value, prime, lane_y, x, top, image, mask, spawn_index):
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        i = self.count
+        self.x[i] = x
+        self.top[i] = top
+        self.width[i], self.height[i] = image.get_size()
+        self.value[i] = value
+        self.prime[i] = prime
+        self.lane[i] = self.lane_ys.index(lane_y)
+        self.spawn_index[i] = spawn_index
+        self.images.append(image)
+        self.masks.append(mask)
+        self.count = i + 1
+
+    def advance(self, dx):
+        # Scrolls every number left by dx pixels in one operation
+        self.x[: self.count] -= dx
+
+    def offscreen(self):
+        # Indices of numbers fully past the left edge, by lane then oldest
+        # first (the order the sprite lanes report them in)
+        n = self.count
+        right = self.x[:n] + self.width[:n]
+        indices = np.flatnonzero(right < 0)
+        if len(indices) > 1:
+            indices = indices[np.lexsort((right[indices], self.lane[indices]))]
+        return indices
+
+    def overlapping(self, rect):
+        # Indices of numbers whose bounding box overlaps rect, in spawn order
+        n = self.count
+        x = self.x[:n]
+        top = self.top[:n]
+        hits = np.flatnonzero(
+            (x < rect.right)
+            & (x + self.width[:n] > rect.left)
+            & (top < rect.bottom)
+            & (top + self.height[:n] > rect.top)
+        )
+        if len(hits) > 1:
+            hits = hits[np.argsort(self.spawn_index[hits], kind="stable")]
+        return hits
+
+    def remove(self, indices):
+        # Drops the given numbers, compacting the arrays with a keep mask
+        if not len(indices):
+            return
+        n = self.count
+        keep = np.ones(n, dtype=bool)
+        keep[indices] = False
+        kept = int(keep.sum())
+        for name in (*INT_FIELDS, "prime"):
+            array = getattr(self, name)
+            array[:kept] = array[:n][keep]
+        flags = keep.tolist()
+        self.images = [image for image, k in zip(self.images, flags) if k]
+        self.masks = [mask for mask, k in zip(self.masks, flags) if k]
+        self.count = kept
+
+    def blit_sequence(self, dx=0):
+        # (surface, topleft) pairs for Surface.blits, shifted right by dx
+        n = self.count
+        positions = zip((self.x[:n] + dx).tolist(), self.top[:n].tolist())
+        return list(zip(self.images, positions))
@@ -0,0 +1,149 @@
+# Non-blocking structured event log.
+#
+# Gameplay events used to be print()ed from inside the frame, which blocks
+# whenever the terminal or journald is slow to drain. EventLog.log() only
+# appends a small dict to an in-memory ring buffer; a background writer
+# thread takes batches off it every flush_interval seconds (or as soon as
+# batch_size records are waiting) and writes them out in one call: JSON lines
+# to a file, or formatted text lines to a stream such as stdout.
+#
+# The buffer is bounded. When the writer falls behind and it fills up, new
+# records are dropped ("drop_newest", the default) or the oldest waiting ones
+# make room ("drop_oldest"). Either way the game never waits, and every
+# dropped record is counted, per event kind too.
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+DROP_POLICIES = ("drop_newest", "drop_oldest")
+DEFAULT_CAPACITY = 4096
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 0.25  # Seconds
+
+
+def json_line(record):
+    return json.dumps(record, separators=(",", ":"))
+
+
+class EventLog:
+    # path: append JSON lines to this file. Without a path, records go to
+    # stream (stdout by default) through formatter, which turns a record into
+    # a line of text or None to skip it.
+    def __init__(
+        self,
+        path=None,
+        stream=None,
+        formatter=json_line,
+        capacity=DEFAULT_CAPACITY,
+        batch_size=DEFAULT_BATCH_SIZE,
+        flush_interval=DEFAULT_FLUSH_INTERVAL,
+        policy="drop_newest",
+    ):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"unknown drop policy {policy!r}")
+        if path is not None:
+            self.output = open(path, "a", encoding="utf-8")
+            self.formatter = json_line
+            self.owns_output = True
+        else:
+            self.output = stream or sys.stdout
+            self.formatter = formatter
+            self.owns_output = False
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.buffer = deque()
+        self.lock = threading.Lock()  # Only held for appends and batch swaps
+        self.wakeup = threading.Event()
+        self.closing = False
+        self.logged = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.dropped_by_kind = {}
+        self.write_errors = 0
+        self.writer = threading.Thread(
+            target=self._write_loop, name="event-log", daemon=True
+        )
+        self.writer.start()
+
+    def log(self, kind, tick=None, value=None):
+        # Never blocks on I/O; may drop a record if the buffer is full
+        record = {"time": time.time(), "tick": tick, "event": kind, "value": value}
+        with self.lock:
+            self.logged += 1
+            if len(self.buffer) >= self.capacity:
+                if self.policy == "drop_newest":
+                    self._count_drop(kind)
+                    return
+                self._count_drop(self.buffer.popleft()["event"])
+            self.buffer.append(record)
+            waiting = len(self.buffer)
+        if waiting >= self.batch_size:
+            self.wakeup.set()
+
+    def log_event(self, event):
+        # An engine.Event
+        self.log(event.kind, event.tick, event.value)
+
+    def _count_drop(self, kind):
+        self.dropped += 1
+        self.dropped_by_kind[kind] = self.dropped_by_kind.get(kind, 0) + 1
+
+    def _take_batch(self):
+        with self.lock:
+            count = min(len(self.buffer), self.batch_size)
+            return [self.buffer.popleft() for _ in range(count)]
+
+    def flush(self):
+        # Writes everything waiting; called from the writer thread (and by
+        # close() once it has stopped)
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            lines = []
+            for record in batch:
+                line = self.formatter(record)
+                if line is not None:
+                    lines.append(line + "\n")
+            try:
+                self.output.write("".join(lines))
+                self.output.flush()
+            except (OSError, ValueError):
+                self.write_errors += 1
+                continue
+            self.written += len(batch)
+            self.batches += 1
+
+    def _write_loop(self):
+        while not self.closing:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.closing = True
+        self.wakeup.set()
+        self.writer.join()
+        self.writer = None
+        self.flush()
+        if self.owns_output:
+            self.output.close()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "logged": self.logged,
+                "written": self.written,
+                "batches": self.batches,
+                "dropped": self.dropped,
+                "dropped_by_kind": dict(self.dropped_by_kind),
+                "write_errors": self.write_errors,
+                "waiting": len(self.buffer),
+            }
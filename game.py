@@ -0,0 +1,595 @@
+# The windowed game: display, assets, sound and the real-time main loop.
+#
+# Nothing here runs at import time. The display, fonts and assets are created
+# the first time something needs them, and the loop only starts when run() is
+# called (see main.py for the command-line entry point).
+import os
+import time
+from functools import cached_property
+
+import pygame
+
+import engine as game_engine
+from asset_cache import DEFAULT_CACHE_FILENAME, load_baked_or_bake
+from event_log import EventLog
+from gc_policy import GcPolicy
+from latency import LatencyTracer
+from profiler import FrameProfiler
+from render import make_renderer
+from replay import Recorder, new_seed
+from snapshot import SnapshotRing
+from settings import (
+    BLACK,
+    FONT_SIZE,
+    GREEN_WIN,
+    NUMBER_SPEED,
+    RED,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    TICKS_PER_SECOND,
+    UI_FONT_SIZE,
+    WHITE,
+)
+from timestep import FixedStepClock, interpolate_positions
+from ui_text import UiText
+
+# Asset loading (paths and fallback handling)
+ASSETS_DIR = "assets"
+PLAYER_IMAGE_FILENAME = "pig.png"
+COLLECT_PRIME_SOUND_FILENAME = "collect_prime.wav"
+GAME_OVER_SOUND_FILENAME = "game_over.wav"
+GRAVITY_FLIP_POWERUP_IMAGE_FILENAME = "gravity_crystal.png"
+POWERUP_COLLECT_SOUND_FILENAME = "powerup_collect.wav"
+# WIN_SOUND_FILENAME = "win.wav" # Optional: Add a win sound
+PLAYER_IMAGE_HEIGHT = 50
+GRAVITY_FLIP_POWERUP_IMAGE_HEIGHT = 30
+
+# Low-latency pacing (see latency.py): poll for keys this often while waiting
+# for the next frame, and busy-wait the last stretch for a precise deadline
+KEY_POLL_INTERVAL = 0.0005
+BUSY_WAIT_SECONDS = 0.001
+
+# With --rewind, the last REWIND_HISTORY_SECONDS of ticks are kept and each
+# BACKSPACE press goes back REWIND_STEP_SECONDS
+REWIND_HISTORY_SECONDS = 10
+REWIND_STEP_SECONDS = 2
+
+# Scaled and flipped images are baked into this file (see asset_cache.py)
+BAKED_ASSETS_PATH = os.path.join(ASSETS_DIR, ".baked", DEFAULT_CACHE_FILENAME)
+PLAYER_IMAGE_PATH = os.path.join(ASSETS_DIR, PLAYER_IMAGE_FILENAME)
+GRAVITY_FLIP_POWERUP_IMAGE_PATH = os.path.join(
+    ASSETS_DIR, GRAVITY_FLIP_POWERUP_IMAGE_FILENAME
+)
+IMAGE_SOURCES = [
+    (PLAYER_IMAGE_PATH, PLAYER_IMAGE_HEIGHT),
+    (GRAVITY_FLIP_POWERUP_IMAGE_PATH, GRAVITY_FLIP_POWERUP_IMAGE_HEIGHT),
+]
+
+
+def console_line(record):
+    # The messages the game has always printed, for the console event log
+    kind, value = record["event"], record["value"]
+    if kind == game_engine.GAME_WON:
+        return "YOU WIN!"
+    if kind == game_engine.NON_PRIME_COLLECTED:
+        return f"Collected NON-PRIME: {value}, GAME OVER!"
+    if kind == game_engine.PRIME_MISSED:
+        return f"Missed PRIME by scrolling: {value}, GAME OVER!"
+    if kind == game_engine.POWERUP_COLLECTED:
+        return "Gravity Flip Charge COLLECTED!"
+    if kind == game_engine.DIFFICULTY_UP:
+        spawn_delay, min_number, max_number_limit = value
+        return (
+            f"Difficulty UP! Spawn delay: {spawn_delay}ms\n"
+            f"Difficulty UP! Number range: {min_number}-{max_number_limit}"
+        )
+    return None
+
+
+def load_image_scaled(filename, target_height, can_be_none=False):
+    try:
+        image_path = os.path.join(ASSETS_DIR, filename)
+        if not os.path.exists(image_path):
+            if can_be_none:
+                return None
+            print(
+                f"Required image not found: {image_path}. Using fallback if possible."
+            )
+            return None  # This should be handled by caller or lead to fallback surface
+        original_image = pygame.image.load(image_path).convert_alpha()
+        img_width = original_image.get_width()
+        img_height = original_image.get_height()
+        scale = target_height / img_height
+        return pygame.transform.scale(
+            original_image, (int(img_width * scale), target_height)
+        )
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Error loading image '{filename}': {e}. Using fallback if possible.")
+        if can_be_none:
+            return None
+        return None
+
+
+def load_sound_file(filename, can_be_none=True):
+    sound_path = os.path.join(ASSETS_DIR, filename)
+    try:
+        if not os.path.exists(sound_path):
+            if can_be_none:
+                return None
+            print(f"Required sound not found: {sound_path}")
+            return None
+        return pygame.mixer.Sound(sound_path)
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Error loading sound '{filename}': {e}.")
+        if can_be_none:
+            return None
+        return None
+
+
+class Game:
+    def __init__(self, options, started_at=None):
+        # started_at is the perf_counter() value startup is measured from
+        self.options = options
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.first_frame_at = None
+        self.running = True
+        self.pending_actions = []  # Input waiting for the next tick
+        self.previous_positions = {}  # Sprite positions before the latest tick
+        self.step_clock = FixedStepClock()
+        self.profiler = FrameProfiler() if options.profile else None
+        self.gc_policy = GcPolicy(options.gc)
+        self.recorder = None  # replay.Recorder for the current game with --record
+        self.latency = LatencyTracer() if options.trace_latency else None
+        self.last_frame_at = time.perf_counter()  # When the last frame was paced
+        self.snapshots = (
+            SnapshotRing(REWIND_HISTORY_SECONDS * TICKS_PER_SECOND)
+            if options.rewind
+            else None
+        )
+        self.rewind_requested = False
+        self.rewinds = 0
+
+    # --- Lazily initialised resources ---
+    @cached_property
+    def screen(self):
+        # Initialize Pygame
+        pygame.mixer.pre_init(44100, -16, 2, 512)
+        pygame.init()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Prime Porkour - Platformer")
+        return screen
+
+    @cached_property
+    def clock(self):
+        self.screen  # Needs pygame.init()
+        return pygame.time.Clock()
+
+    @cached_property
+    def renderer(self):
+        renderer = make_renderer(self.options.renderer, self.screen)
+        renderer.profiler = self.profiler
+        return renderer
+
+    @cached_property
+    def main_font(self):
+        self.screen  # Needs pygame.init()
+        return pygame.font.SysFont(None, FONT_SIZE)
+
+    @cached_property
+    def ui_font(self):
+        self.screen  # Needs pygame.init()
+        return pygame.font.SysFont(None, UI_FONT_SIZE)
+
+    @cached_property
+    def ui_text(self):
+        # Text is only re-rendered when it changes (see ui_text.py)
+        return UiText()
+
+    @cached_property
+    def score_label(self):
+        return self.ui_text.label(self.main_font, BLACK, "Score: {}")
+
+    @cached_property
+    def final_score_label(self):
+        return self.ui_text.label(self.main_font, WHITE, "Final Score: {}")
+
+    @cached_property
+    def images(self):
+        self.screen  # convert_alpha() needs a display
+        baked = {}
+        if self.options.asset_cache:
+            try:
+                baked = load_baked_or_bake(IMAGE_SOURCES, BAKED_ASSETS_PATH)
+            except (OSError, ValueError, pygame.error) as e:
+                print(f"Baked asset cache unavailable: {e}. Loading images directly.")
+        player = baked.get(PLAYER_IMAGE_PATH)
+        powerup = baked.get(GRAVITY_FLIP_POWERUP_IMAGE_PATH)
+        return {
+            "player": player.normal
+            if player
+            else load_image_scaled(PLAYER_IMAGE_FILENAME, PLAYER_IMAGE_HEIGHT),
+            "player_flipped": player.flipped if player else None,
+            "gravity_powerup": powerup.normal
+            if powerup
+            else load_image_scaled(
+                GRAVITY_FLIP_POWERUP_IMAGE_FILENAME,
+                GRAVITY_FLIP_POWERUP_IMAGE_HEIGHT,
+                can_be_none=True,
+            ),
+        }
+
+    @cached_property
+    def sounds(self):
+        self.screen  # Needs the mixer
+        return {
+            "collect_prime": load_sound_file(COLLECT_PRIME_SOUND_FILENAME),
+            "game_over": load_sound_file(GAME_OVER_SOUND_FILENAME),
+            "powerup_collect": load_sound_file(
+                POWERUP_COLLECT_SOUND_FILENAME, can_be_none=True
+            ),
+            # "win": load_sound_file(WIN_SOUND_FILENAME), # Optional
+        }
+
+    @cached_property
+    def event_log(self):
+        # Gameplay events are written by a background thread (see event_log.py)
+        if self.options.event_log:
+            return EventLog(path=self.options.event_log)
+        return EventLog(formatter=console_line)
+
+    @cached_property
+    def engine(self):
+        # Game State (owned by the headless engine, see engine.py)
+        engine = game_engine.Engine(
+            player_image=self.images["player"],
+            player_image_flipped=self.images["player_flipped"],
+            powerup_image=self.images["gravity_powerup"],
+            font=self.main_font,
+            prewarm_glyphs=True,
+            entity_store=self.options.entity_store,
+            frenzy=self.options.frenzy,
+        )
+        engine.profiler = self.profiler
+        engine.spawner.start()  # Plan upcoming spawns off the frame path
+        return engine
+
+    def play_sound(self, name):
+        sound = self.sounds[name]
+        if sound:
+            sound.play()
+
+    def handle_engine_event(self, event):
+        # Turn engine events into sounds and event log records
+        if event.kind != game_engine.SPAWNED:
+            self.event_log.log_event(event)
+        # Optional: self.play_sound("win") on GAME_WON
+        if event.kind == game_engine.PRIME_COLLECTED:
+            self.play_sound("collect_prime")
+        elif event.kind in (
+            game_engine.NON_PRIME_COLLECTED,
+            game_engine.PRIME_MISSED,
+        ):
+            self.play_sound("game_over")
+        elif event.kind == game_engine.POWERUP_COLLECTED:
+            self.play_sound("powerup_collect")
+        elif event.kind == game_engine.GRAVITY_FLIPPED:
+            self.play_sound("powerup_collect")
+            # The player jumped straight to the other side: draw it there
+            # rather than interpolating across the screen
+            self.previous_positions.pop(self.engine.player, None)
+
+    # --- Screen Display Functions ---
+    def show_end_screen(self, title_text, restart_prompt):
+        screen = self.screen
+        screen.fill(BLACK)
+        score_text_render = self.final_score_label.render(self.engine.score)
+        restart_text = self.ui_text.static(restart_prompt, self.main_font, WHITE)
+        screen.blit(
+            title_text,
+            (SCREEN_WIDTH // 2 - title_text.get_width() // 2, SCREEN_HEIGHT // 3),
+        )
+        screen.blit(
+            score_text_render,
+            (
+                SCREEN_WIDTH // 2 - score_text_render.get_width() // 2,
+                SCREEN_HEIGHT // 2,
+            ),
+        )
+        screen.blit(
+            restart_text,
+            (
+                SCREEN_WIDTH // 2 - restart_text.get_width() // 2,
+                SCREEN_HEIGHT // 2 + 50,
+            ),
+        )
+        pygame.display.flip()
+        return self.wait_for_restart()
+
+    def wait_for_restart(self):
+        # True to play again, False to quit
+        while True:
+            for event_loop in pygame.event.get():
+                if event_loop.type == pygame.QUIT:
+                    return False
+                if event_loop.type == pygame.KEYDOWN:
+                    if event_loop.key == pygame.K_q:
+                        return False
+                    if event_loop.key == pygame.K_r:
+                        return True  # Restart
+            self.clock.tick(15)
+
+    def show_game_over_screen(self):
+        game_over_text = self.ui_text.static("GAME OVER", self.main_font, RED)
+        return self.show_end_screen(game_over_text, "Press R to Restart or Q to Quit")
+
+    def show_win_screen(self):
+        win_text_render = self.ui_text.static(
+            "!!! YOU WIN !!!", self.main_font, GREEN_WIN
+        )
+        # Optional: Play win sound
+        # self.play_sound("win")
+        return self.show_end_screen(
+            win_text_render, "Press R to Play Again or Q to Quit"
+        )
+
+    def reset_game(self):
+        if self.options.record:
+            self.engine.reset(new_seed())  # A known seed makes the run replayable
+            self.recorder = Recorder(self.engine)
+        else:
+            self.engine.reset()
+        self.gc_policy.safe_point()  # Nobody is watching between games
+        self.renderer.invalidate()  # The end screens drew over everything
+        self.step_clock.reset()
+        self.previous_positions = {}
+        self.pending_actions.clear()
+        if self.snapshots is not None:
+            self.snapshots.clear()
+            self.snapshots.record(self.engine)
+        if self.latency:
+            self.latency.discard()
+        self.clock.tick()  # Don't count the time spent on the end screens
+
+    def save_recording(self):
+        if self.recorder is not None:
+            path = self.recorder.save(self.options.record, self.engine)
+            print(f"Recording saved to {path}")
+            self.recorder = None
+
+    def end_game(self):
+        # Shows the right end screen, then restarts or stops the loop
+        self.save_recording()
+        engine = self.engine
+        show_screen = (
+            self.show_win_screen if engine.game_won else self.show_game_over_screen
+        )
+        if show_screen():
+            self.reset_game()
+        else:
+            self.running = False
+
+    def load(self):
+        # Builds the lazily initialised session-long resources, so that
+        # freeze_after_load() sees them
+        self.engine  # Also the screen, fonts, images, pools and glyph cache
+        self.renderer
+        self.sounds
+        self.ui_font
+        self.score_label
+        self.final_score_label
+        self.event_log
+
+    # --- Game Loop ---
+    def run(self):
+        self.load()
+        self.gc_policy.freeze_after_load()
+        self.reset_game()  # Initialize/reset game state here, after all definitions
+        while self.running:
+            self.run_frame()
+            if self.options.low_latency:
+                self.wait_for_frame()
+            else:
+                self.clock.tick(self.options.fps)
+            self.gc_policy.end_frame()
+        self.save_recording()  # Quitting mid-game still leaves a replayable run
+        self.report()
+        pygame.quit()
+
+    def wait_for_frame(self):
+        # Low-latency pacing: keep polling until the next frame is due and
+        # start it at once if a key comes in; tick_busy_loop hits the
+        # deadline itself more precisely than clock.tick()'s sleep
+        deadline = self.last_frame_at + 1 / self.options.fps - BUSY_WAIT_SECONDS
+        while time.perf_counter() < deadline:
+            if pygame.event.peek(pygame.KEYDOWN):
+                self.clock.tick()
+                break
+            time.sleep(KEY_POLL_INTERVAL)
+        else:
+            self.clock.tick_busy_loop(self.options.fps)
+        self.last_frame_at = time.perf_counter()
+
+    def handle_input(self):
+        engine = self.engine
+        profiler = self.profiler
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and profiler:
+                profiler.toggle_overlay()
+            if (
+                event.type == pygame.KEYDOWN
+                and event.key == pygame.K_BACKSPACE
+                and self.snapshots is not None
+            ):
+                self.rewind_requested = True
+
+            if engine.running and event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    self.pending_actions.append(game_engine.JUMP)
+                if event.key == pygame.K_f:  # Only one block for K_f
+                    self.pending_actions.append(game_engine.FLIP)
+                if self.latency and event.key in (pygame.K_SPACE, pygame.K_f):
+                    # Injected events can carry their own perf_counter() stamp
+                    self.latency.key_received(getattr(event, "sent_at", None))
+        if profiler:
+            profiler.lap("events")
+
+    def run_frame(self):
+        engine = self.engine
+        profiler = self.profiler
+        if profiler:
+            profiler.begin_frame()
+        self.handle_input()
+
+        if not engine.running:
+            self.end_game()
+            return
+
+        if self.rewind_requested:
+            self.rewind()
+
+        # Run as many fixed ticks as the elapsed time calls for. Input is
+        # applied on the first one; spawning, movement, collisions and
+        # difficulty all happen inside each tick.
+        steps = self.step_clock.advance(self.clock.get_time())
+        if (
+            not steps
+            and self.pending_actions
+            and self.options.low_latency
+            and self.step_clock.accumulator >= 0
+        ):
+            # Apply the input now rather than on the next frame's tick
+            self.step_clock.borrow_step()
+            steps = 1
+        for step_index in range(steps):
+            if step_index == steps - 1:
+                self.previous_positions = {
+                    sprite: sprite.rect.topleft for sprite in engine.all_sprites
+                }
+            engine_events = engine.step(self.pending_actions)
+            if self.recorder is not None:
+                self.recorder.record(engine.tick, self.pending_actions, engine_events)
+            if self.snapshots is not None:
+                self.snapshots.record(engine)
+            for engine_event in engine_events:
+                self.handle_engine_event(engine_event)
+            self.pending_actions.clear()
+            if self.latency:
+                self.latency.inputs_applied()
+            if not engine.running:
+                break
+
+        if engine.game_over:  # Check again in case collision caused game over
+            self.end_game()
+            return  # Skip drawing the main game if game over screen is shown
+
+        self.draw()
+        if self.latency:
+            self.latency.frame_presented()  # The renderers flip inside draw()
+        if profiler:
+            profiler.end_frame()
+        if self.first_frame_at is None:
+            self.first_frame_at = time.perf_counter()
+            if self.options.startup_time:
+                print(
+                    f"Startup: first frame after "
+                    f"{(self.first_frame_at - self.started_at) * 1000:.1f} ms"
+                )
+
+    def rewind(self):
+        # Jump back REWIND_STEP_SECONDS (or as far as the history goes)
+        self.rewind_requested = False
+        state = self.snapshots.rewind(
+            self.engine, REWIND_STEP_SECONDS * TICKS_PER_SECOND
+        )
+        if state is None:
+            return
+        self.rewinds += 1
+        self.pending_actions.clear()  # Keys pressed before the jump are void
+        if self.latency:
+            self.latency.discard()
+        self.previous_positions = {}  # Sprites were rebuilt: no interpolation
+        self.renderer.invalidate()
+
+    def draw(self):
+        # Draw / Render
+        engine = self.engine
+        score_display = self.score_label.render(engine.score)
+        positions = interpolate_positions(
+            self.previous_positions, engine.all_sprites, self.step_clock.alpha
+        )
+        hud = [(score_display, (10, 10))]
+        profiler = self.profiler
+        if profiler and profiler.overlay_visible:
+            overlay = profiler.overlay_surface(self.ui_font)
+            hud.append((overlay, (SCREEN_WIDTH - overlay.get_width() - 10, 10)))
+        batch = None
+        if engine.number_store is not None:
+            # Stored numbers all scroll at NUMBER_SPEED, so interpolating them
+            # is a single offset
+            offset = 0
+            if self.previous_positions:
+                offset = round(NUMBER_SPEED * (1 - self.step_clock.alpha))
+            batch = engine.number_store.blit_sequence(offset)
+        self.renderer.draw(engine.all_sprites, hud, positions, batch)
+
+    def report(self):
+        engine = self.engine
+        pool_stats = [engine.number_pool.stats(), engine.powerup_pool.stats()]
+        gc_stats = self.gc_policy.stats()
+        minutes = max(pygame.time.get_ticks() / 60000, 1e-9)
+        print(
+            f"Sprite pools: {sum(p['reused'] for p in pool_stats) / minutes:.0f} "
+            f"allocations avoided per minute, "
+            f"{sum(p['created'] for p in pool_stats)} created"
+        )
+        print(
+            f"GC ({gc_stats['mode']}): {gc_stats['collections']} collections, "
+            f"max pause {gc_stats['pause_ms_max']:.2f} ms, "
+            f"{gc_stats['pauses_avoided_per_minute']:.1f} pauses avoided per minute"
+        )
+        self.gc_policy.close()
+        event_log = self.event_log
+        event_log.close()
+        log_stats = event_log.stats()
+        print(
+            f"Event log: {log_stats['logged']} events in {log_stats['batches']} "
+            f"batches, {log_stats['dropped']} dropped"
+        )
+        spawner = engine.spawner
+        spawner.stop()
+        spawn_stats = spawner.stats()
+        print(
+            f"Spawn scheduler: {spawn_stats['popped']} spawns, "
+            f"{spawn_stats['planned_on_demand']} planned on the spot, "
+            f"{spawn_stats['invalidations']} invalidations"
+        )
+        profiler = self.profiler
+        if profiler:
+            profiler.export_csv(self.options.profile_csv)
+            for phase, (p50, p95, p99) in profiler.summary().items():
+                print(
+                    f"{phase:10s} p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms"
+                )
+            print(f"Frame profile written to {self.options.profile_csv}")
+        print(
+            f"Fixed timestep: {self.step_clock.steps} ticks run, "
+            f"{self.step_clock.dropped_steps} dropped under load"
+        )
+        renderer = self.renderer
+        print(
+            f"Renderer '{renderer.name}': "
+            f"{renderer.average_pixels_pushed():.0f} pixels pushed per frame on average"
+        )
+        if self.snapshots is not None:
+            print(f"Rewind: {self.rewinds} rewinds")
+        latency = self.latency
+        if latency:
+            stats = latency.summary()
+            loop = "low-latency" if self.options.low_latency else "standard"
+            print(
+                f"Input latency ({loop} loop): {latency.traced} keys, "
+                f"p50 {stats['p50']:.2f} ms  p95 {stats['p95']:.2f} ms  "
+                f"p99 {stats['p99']:.2f} ms  max {stats['max']:.2f} ms"
+            )
@@ -0,0 +1,85 @@
+# Garbage collector policy for the windowed game.
+#
+# CPython's cyclic collector runs whenever enough container objects have been
+# allocated, which means in the middle of a frame, where its pause shows up as
+# a hitch. In "deferred" mode the long-lived objects created while loading
+# (assets, fonts, pools) are frozen out of the collector's view, automatic
+# collection is switched off during play, and collections happen only at safe
+# points such as reset_game. A safety valve still collects the youngest
+# generation if garbage piles up far beyond the normal threshold.
+import gc
+import time
+
+GC_MODES = ("deferred", "auto")
+
+# Collect generation 0 anyway once it holds this many times its usual threshold
+SAFETY_VALVE_FACTOR = 50
+
+
+class GcPolicy:
+    def __init__(self, mode="deferred"):
+        self.mode = mode
+        self.started_at = time.perf_counter()
+        self.pause_started_at = None
+        self.collections = 0
+        self.pause_seconds = 0.0
+        self.max_pause_seconds = 0.0
+        self.safe_point_collections = 0
+        self.valve_collections = 0
+        self.deferred_collections = 0  # Automatic gen-0 runs that never happened
+        gc.callbacks.append(self._on_gc)
+
+    def freeze_after_load(self):
+        # Everything allocated so far lives for the whole session
+        if self.mode != "deferred":
+            return
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+
+    def safe_point(self):
+        # Called when a pause can't be seen, e.g. between games
+        if self.mode != "deferred":
+            return
+        self.deferred_collections += gc.get_count()[0] // gc.get_threshold()[0]
+        gc.collect()
+        self.safe_point_collections += 1
+
+    def end_frame(self):
+        if self.mode != "deferred":
+            return
+        threshold = gc.get_threshold()[0]
+        count = gc.get_count()[0]
+        if count > threshold * SAFETY_VALVE_FACTOR:
+            self.deferred_collections += count // threshold
+            gc.collect(0)
+            self.valve_collections += 1
+
+    def close(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self.mode == "deferred":
+            gc.enable()
+            gc.unfreeze()
+
+    def stats(self):
+        minutes = max((time.perf_counter() - self.started_at) / 60, 1e-9)
+        return {
+            "mode": self.mode,
+            "collections": self.collections,
+            "pause_ms_total": self.pause_seconds * 1000,
+            "pause_ms_max": self.max_pause_seconds * 1000,
+            "safe_point_collections": self.safe_point_collections,
+            "valve_collections": self.valve_collections,
+            "pauses_avoided_per_minute": self.deferred_collections / minutes,
+        }
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self.pause_started_at = time.perf_counter()
+        elif self.pause_started_at is not None:
+            pause = time.perf_counter() - self.pause_started_at
+            self.pause_started_at = None
+            self.collections += 1
+            self.pause_seconds += pause
+            self.max_pause_seconds = max(self.max_pause_seconds, pause)
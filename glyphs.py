@@ -0,0 +1,66 @@
+# Bounded LRU cache of rendered number glyphs and their collision masks.
+#
+# Number values only span INITIAL_MIN_NUMBER..MAX_NUMBER_CAP, so after warm-up
+# spawning a Number is a dictionary lookup instead of a font render plus a
+# mask build. Surfaces are shared between sprites and must not be drawn on.
+from collections import OrderedDict
+
+import pygame
+
+DEFAULT_MAX_GLYPHS = 1024
+
+
+class GlyphCache:
+    def __init__(self, max_size=DEFAULT_MAX_GLYPHS):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, value, font, color):
+        # Returns (surface, mask) for value rendered in font/color
+        key = (value, font, color)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        entry = self._render(value, font, color)
+        self.entries[key] = entry
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def warm(self, values, font, color):
+        # Render any of values not cached yet, without touching the counters
+        for value in values:
+            key = (value, font, color)
+            if key not in self.entries:
+                self.entries[key] = self._render(value, font, color)
+                if len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _render(value, font, color):
+        surface = font.render(str(value), True, color)
+        if pygame.display.get_surface() is not None:
+            # Match the display's pixel format so blits need no conversion
+            surface = surface.convert_alpha()
+        return surface, pygame.mask.from_surface(surface)
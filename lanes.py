@@ -0,0 +1,72 @@
+# Lane-aware broadphase for scrolling sprites.
+#
+# Numbers and powerups only ever sit in the two lanes (NUMBER_LEVEL_TOP_Y /
+# NUMBER_LEVEL_BOTTOM_Y) and every sprite of one kind scrolls left at the same
+# speed, so inside a lane their order never changes. Each lane keeps a deque
+# ordered by rect.right: the sprites leaving the screen are always at the
+# front, and the only ones that can touch the player are the first few.
+from collections import deque
+
+
+class LaneIndex:
+    def __init__(self, lane_ys):
+        self.lanes = {y: deque() for y in lane_ys}
+        self.max_width = 0
+
+    def __len__(self):
+        return sum(len(lane) for lane in self.lanes.values())
+
+    def __iter__(self):
+        for lane in self.lanes.values():
+            yield from lane
+
+    def clear(self):
+        for lane in self.lanes.values():
+            lane.clear()
+        self.max_width = 0
+
+    def add(self, sprite):
+        lane = self.lanes[sprite.rect.centery]
+        self.max_width = max(self.max_width, sprite.rect.width)
+        right = sprite.rect.right
+        # New sprites spawn at the right edge, so this is almost always an append
+        index = len(lane)
+        while index and lane[index - 1].rect.right > right:
+            index -= 1
+        lane.insert(index, sprite)
+
+    def discard(self, sprite):
+        lane = self.lanes.get(sprite.rect.centery)
+        if lane is None:
+            return
+        if lane and lane[0] is sprite:
+            lane.popleft()
+        else:
+            try:
+                lane.remove(sprite)
+            except ValueError:
+                pass
+
+    def pop_offscreen(self):
+        # Sprites that scrolled fully off the left edge, oldest first
+        gone = []
+        for lane in self.lanes.values():
+            while lane and lane[0].rect.right < 0:
+                gone.append(lane.popleft())
+        return gone
+
+    def candidates(self, rect):
+        # Sprites whose rect overlaps rect; only walks the front of each lane
+        found = []
+        left = rect.left
+        stop_right = rect.right + self.max_width
+        for lane in self.lanes.values():
+            for sprite in lane:
+                sprite_rect = sprite.rect
+                if sprite_rect.right < left:
+                    continue
+                if sprite_rect.right > stop_right:
+                    break
+                if sprite_rect.colliderect(rect):
+                    found.append(sprite)
+        return found
@@ -0,0 +1,68 @@
+# Input-to-photon latency tracing.
+#
+# A key press goes through three stages before the player can see it: the
+# main loop pulls it off the event queue, a tick applies the action, and the
+# frame drawn after that tick is flipped to the screen. LatencyTracer stamps
+# each game key when it is received and again when that frame is flipped,
+# and keeps the differences for a p50/p95/p99 report.
+#
+# SDL does not say when a key was actually pressed, so real keys are stamped
+# when the loop pulls them off the queue. Synthetic KEYDOWN events posted with
+# a sent_at attribute (a perf_counter() value) are measured from that instead,
+# which includes the time spent waiting in the queue.
+#
+# The usual loop polls input at the start of a frame and sleeps in
+# clock.tick() at the end, so a key pressed during the sleep waits for the
+# rest of the frame. The low-latency loop (--low-latency) keeps polling while
+# it waits and starts the frame as soon as a key arrives, runs the tick that
+# applies it right away, and paces frames with tick_busy_loop instead of a
+# coarse sleep.
+import time
+from collections import deque
+
+from profiler import percentile
+
+DEFAULT_WINDOW = 3600  # Key presses kept for the report
+
+
+class LatencyTracer:
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.received = []  # perf_counter() stamps of keys no tick has applied
+        self.applied = []  # Applied keys waiting for their frame to be flipped
+        self.samples = deque(maxlen=window)  # Latencies in seconds
+        self.traced = 0
+        self.discarded = 0  # Keys that never reached the screen (game ended)
+
+    def key_received(self, at=None):
+        self.received.append(time.perf_counter() if at is None else at)
+
+    def inputs_applied(self):
+        # A tick just consumed every key received so far
+        self.applied.extend(self.received)
+        self.received.clear()
+
+    def frame_presented(self, at=None):
+        # The frame showing every applied key was just flipped
+        if not self.applied:
+            return
+        now = time.perf_counter() if at is None else at
+        self.samples.extend(now - stamp for stamp in self.applied)
+        self.traced += len(self.applied)
+        self.applied.clear()
+
+    def discard(self):
+        # Pending keys were thrown away, e.g. by a reset
+        self.discarded += len(self.received) + len(self.applied)
+        self.received.clear()
+        self.applied.clear()
+
+    def summary(self):
+        # {"p50", "p95", "p99", "max", "mean"} in milliseconds
+        values = sorted(self.samples)
+        result = {
+            f"p{int(fraction * 100)}": percentile(values, fraction) * 1000
+            for fraction in (0.5, 0.95, 0.99)
+        }
+        result["max"] = values[-1] * 1000 if values else 0.0
+        result["mean"] = sum(values) / len(values) * 1000 if values else 0.0
+        return result
@@ -0,0 +1,42 @@
+# Free-list pools for the short-lived scrolling sprites.
+#
+# Every spawn used to build a new Number / GravityFlipPowerUp and every
+# despawn threw it away. Pooled sprites are re-initialised in place with
+# reinit(), so a long session allocates a handful of sprites up front and then
+# recycles them.
+DEFAULT_MAX_FREE = 64
+
+
+class SpritePool:
+    def __init__(self, factory, max_free=DEFAULT_MAX_FREE):
+        # factory(*args) builds a new sprite; sprite.reinit(*args) recycles one
+        self.factory = factory
+        self.max_free = max_free
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0  # Released while the free list was full
+
+    def acquire(self, *args):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reinit(*args)
+            self.reused += 1
+            return sprite
+        self.created += 1
+        return self.factory(*args)
+
+    def release(self, sprite):
+        # The sprite must already be out of every group (sprite.kill())
+        if len(self.free) < self.max_free:
+            self.free.append(sprite)
+        else:
+            self.discarded += 1
+
+    def stats(self):
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "discarded": self.discarded,
+            "free": len(self.free),
+        }
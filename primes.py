@@ -0,0 +1,142 @@
+# Prime oracle: a sieve over the active number range plus a Miller-Rabin
+# fallback for anything above it.
+#
+# Spawning asks "is this prime?" for every Number, so the answer should be a
+# table lookup. The sieve starts small and grows (by doubling) whenever the
+# difficulty raises current_max_number_limit past it.
+#
+# DensitySampler builds on the sieve to draw numbers with a chosen share of
+# primes instead of whatever share a uniform draw happens to give.
+from array import array
+from bisect import bisect_right
+
+# Deterministic Miller-Rabin witnesses, exact for every n < 3.3 * 10**24
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def _sieve(limit):
+    # One byte per integer in [0, limit]; 1 means prime
+    flags = bytearray([1]) * (limit + 1)
+    flags[0] = flags[1] = 0
+    for i in range(2, int(limit**0.5) + 1):
+        if flags[i]:
+            flags[i * i :: i] = bytes(len(range(i * i, limit + 1, i)))
+    return flags
+
+
+def miller_rabin(num):
+    if num < 2:
+        return False
+    for p in MILLER_RABIN_BASES:
+        if num % p == 0:
+            return num == p
+    d = num - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in MILLER_RABIN_BASES:
+        x = pow(a, d, num)
+        if x == 1 or x == num - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % num
+            if x == num - 1:
+                break
+        else:
+            return False
+    return True
+
+
+class PrimeOracle:
+    def __init__(self, limit=100):
+        self.limit = 1
+        self.flags = bytearray(2)
+        self.sieve_lookups = 0
+        self.fallback_lookups = 0
+        self.ensure(limit)
+
+    def ensure(self, limit):
+        # Make sure every n <= limit is answered from the sieve
+        if limit <= self.limit:
+            return
+        new_limit = max(limit, self.limit * 2)
+        self.flags = _sieve(new_limit)
+        self.limit = new_limit
+
+    def is_prime(self, num):
+        if num < 2:
+            return False
+        if num <= self.limit:
+            self.sieve_lookups += 1
+            return bool(self.flags[num])
+        self.fallback_lookups += 1
+        return miller_rabin(num)
+
+
+default_oracle = PrimeOracle()
+
+
+def is_easy_composite(num):
+    # Composites anyone spots at a glance: even, or ending in 0 or 5
+    return num % 2 == 0 or num % 5 == 0
+
+
+class DensitySampler:
+    # Draws from [low, high] so that about prime_ratio of the draws are prime.
+    # The primes and non-primes of the range are kept in two sorted arrays;
+    # a draw is one random() to pick an array and one randrange() into it.
+    # Widening the range only appends the new numbers to each array.
+    def __init__(self, low, high, prime_ratio, skip_easy_composites=False, oracle=None):
+        self.low = low
+        self.high = low - 1
+        self.prime_ratio = prime_ratio
+        self.skip_easy_composites = skip_easy_composites
+        self.oracle = oracle or default_oracle
+        self.primes = array("l")
+        self.composites = array("l")  # Every non-prime, 0 and 1 included
+        self.extend(high)
+
+    def extend(self, high):
+        if high <= self.high:
+            return
+        self.oracle.ensure(high)
+        flags = self.oracle.flags
+        skip_easy = self.skip_easy_composites
+        for num in range(max(self.low, self.high + 1), high + 1):
+            if num >= 2 and flags[num]:
+                self.primes.append(num)
+            elif not (skip_easy and is_easy_composite(num)):
+                self.composites.append(num)
+        self.high = high
+
+    def truncate(self, high):
+        # Shrinks the range back to [low, high] without rebuilding it
+        if high >= self.high:
+            return
+        del self.primes[bisect_right(self.primes, high) :]
+        del self.composites[bisect_right(self.composites, high) :]
+        self.high = high
+
+    def _draw(self, rng, prime_count, composite_count):
+        pick_prime = rng.random() < self.prime_ratio
+        if pick_prime and prime_count or not composite_count:
+            return self.primes, rng.randrange(prime_count)
+        return self.composites, rng.randrange(composite_count)
+
+    def draw(self, rng):
+        pool, index = self._draw(rng, len(self.primes), len(self.composites))
+        return pool[index]
+
+    def redraw(self, rng, high):
+        # Repeats the random draws of a draw() made while the range ended at
+        # high, even if it has been widened since
+        self._draw(
+            rng,
+            bisect_right(self.primes, high),
+            bisect_right(self.composites, high),
+        )
+
+
+def is_prime(num):
+    return default_oracle.is_prime(num)
@@ -0,0 +1,102 @@
+# Per-phase frame profiler with an on-screen overlay and CSV export.
+#
+# Each frame is split into phases by lap(name): the time since the previous
+# lap is added to that phase. The engine laps spawn/update/collision/
+# difficulty inside every tick it runs, the main loop laps the event pump
+# and the renderers lap draw and flip. Recent frames feed rolling windows
+# that the overlay summarises as p50/p95/p99.
+import csv
+import time
+from collections import deque
+
+import pygame
+
+PHASES = ("events", "spawn", "update", "collision", "difficulty", "draw", "flip")
+
+DEFAULT_WINDOW = 600  # Frames in the rolling percentile window (10s at 60fps)
+DEFAULT_HISTORY = 36000  # Frames kept for the CSV export (10 minutes at 60fps)
+OVERLAY_REFRESH_FRAMES = 30
+OVERLAY_BACKGROUND = (0, 0, 0, 170)
+OVERLAY_TEXT_COLOR = (255, 255, 255)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    def __init__(self, phases=PHASES, window=DEFAULT_WINDOW, history=DEFAULT_HISTORY):
+        self.phases = phases
+        self.windows = {phase: deque(maxlen=window) for phase in phases}
+        self.frame_window = deque(maxlen=window)
+        self.history = deque(maxlen=history)
+        self.frames = 0
+        self.current = dict.fromkeys(phases, 0)
+        self.frame_started_ns = self.last_lap_ns = time.perf_counter_ns()
+        self.overlay_visible = False
+        self.overlay = None
+        self.overlay_age = 0
+
+    def begin_frame(self):
+        for phase in self.phases:
+            self.current[phase] = 0
+        self.frame_started_ns = self.last_lap_ns = time.perf_counter_ns()
+
+    def lap(self, phase):
+        now = time.perf_counter_ns()
+        self.current[phase] += now - self.last_lap_ns
+        self.last_lap_ns = now
+
+    def end_frame(self):
+        total = time.perf_counter_ns() - self.frame_started_ns
+        row = [self.current[phase] for phase in self.phases]
+        for phase, value in zip(self.phases, row):
+            self.windows[phase].append(value)
+        self.frame_window.append(total)
+        self.history.append((self.frames, total, *row))
+        self.frames += 1
+
+    def summary(self):
+        # {phase: (p50, p95, p99)} in milliseconds, plus the whole frame
+        result = {}
+        windows = dict(self.windows, frame=self.frame_window)
+        for name, window in windows.items():
+            values = sorted(window)
+            result[name] = tuple(
+                percentile(values, fraction) / 1e6 for fraction in (0.5, 0.95, 0.99)
+            )
+        return result
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self.overlay = None
+
+    def overlay_surface(self, font):
+        # Rebuilt every OVERLAY_REFRESH_FRAMES so it costs little and reads well
+        if self.overlay is not None and self.overlay_age < OVERLAY_REFRESH_FRAMES:
+            self.overlay_age += 1
+            return self.overlay
+        lines = ["phase        p50    p95    p99 ms"]
+        for name, (p50, p95, p99) in self.summary().items():
+            lines.append(f"{name:10s} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        rendered = [font.render(line, True, OVERLAY_TEXT_COLOR) for line in lines]
+        line_height = font.get_linesize()
+        width = max(surface.get_width() for surface in rendered) + 12
+        surface = pygame.Surface(
+            (width, line_height * len(rendered) + 12), pygame.SRCALPHA
+        )
+        surface.fill(OVERLAY_BACKGROUND)
+        for index, line_surface in enumerate(rendered):
+            surface.blit(line_surface, (6, 6 + index * line_height))
+        self.overlay = surface
+        self.overlay_age = 0
+        return surface
+
+    def export_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "frame_ns", *(f"{p}_ns" for p in self.phases)])
+            writer.writerows(self.history)
@@ -0,0 +1,201 @@
+# Frame renderers for the windowed game.
+#
+# FullRenderer is the classic path: clear the whole screen, draw everything
+# and flip. DirtyRectRenderer keeps a pre-rendered static background, restores
+# only the areas sprites and HUD text moved away from, and pushes just those
+# rectangles with pygame.display.update(rects). Both report how many pixels
+# they sent to the display. Both also take an optional batch of
+# (surface, topleft) pairs, drawn after the sprites with one Surface.blits
+# call (the array-backed numbers of entities.py).
+import pygame
+
+from settings import (  # noqa: F401 - RENDERERS re-exported
+    BLACK,
+    CEILING_Y,
+    GROUND_Y,
+    RENDERERS,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    WHITE,
+)
+
+
+def build_background(size):
+    background = pygame.Surface(size)
+    background.fill(WHITE)
+    # Draw a simple ground line
+    pygame.draw.line(background, BLACK, (0, GROUND_Y), (SCREEN_WIDTH, GROUND_Y), 2)
+    pygame.draw.line(
+        background, BLACK, (0, CEILING_Y), (SCREEN_WIDTH, CEILING_Y), 2
+    )  # Draw ceiling line
+    if pygame.display.get_surface() is not None:
+        background = background.convert()
+    return background
+
+
+class FullRenderer:
+    name = "full"
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.profiler = None  # Optional profiler.FrameProfiler
+        self.frames = 0
+        self.pixels_pushed = 0
+        self.last_pixels_pushed = 0
+
+    def invalidate(self):
+        # Something else drew over the screen; nothing to do for a full redraw
+        pass
+
+    def draw(self, sprites, hud, positions=None, batch=None):
+        # hud is a list of (surface, position) drawn on top of the sprites;
+        # positions optionally maps a sprite to an interpolated topleft
+        screen = self.screen
+        screen.fill(WHITE)
+        # Draw a simple ground line
+        pygame.draw.line(screen, BLACK, (0, GROUND_Y), (SCREEN_WIDTH, GROUND_Y), 2)
+        pygame.draw.line(
+            screen, BLACK, (0, CEILING_Y), (SCREEN_WIDTH, CEILING_Y), 2
+        )  # Draw ceiling line
+        positions = positions or {}
+        for sprite in sprites:
+            screen.blit(sprite.image, positions.get(sprite, sprite.rect))
+        if batch:
+            screen.blits(batch, doreturn=False)
+        for surface, position in hud:
+            screen.blit(surface, position)
+        self._lap("draw")
+        pygame.display.flip()
+        self._lap("flip")
+        self._count(SCREEN_WIDTH * SCREEN_HEIGHT)
+
+    def average_pixels_pushed(self):
+        return self.pixels_pushed / self.frames if self.frames else 0.0
+
+    def _lap(self, phase):
+        if self.profiler is not None:
+            self.profiler.lap(phase)
+
+    def _count(self, pixels):
+        self.frames += 1
+        self.last_pixels_pushed = pixels
+        self.pixels_pushed += pixels
+
+
+class DirtyRectRenderer(FullRenderer):
+    name = "dirty"
+
+    def __init__(self, screen):
+        super().__init__(screen)
+        self.background = build_background(screen.get_size())
+        self.screen_rect = screen.get_rect()
+        self.sprite_rects = {}  # sprite -> rect it was drawn at last frame
+        self.hud_drawn = []  # (surface, rect) drawn last frame
+        self.batch_rects = []  # Rects the batch was drawn at last frame
+        self.needs_full_redraw = True
+
+    def invalidate(self):
+        self.needs_full_redraw = True
+
+    def draw(self, sprites, hud, positions=None, batch=None):
+        screen = self.screen
+        positions = positions or {}
+        batch = batch or []
+        if self.needs_full_redraw:
+            self.needs_full_redraw = False
+            screen.blit(self.background, (0, 0))
+            self.sprite_rects = {
+                sprite: screen.blit(sprite.image, positions.get(sprite, sprite.rect))
+                for sprite in sprites
+            }
+            self.batch_rects = screen.blits(batch)
+            self.hud_drawn = [
+                (surface, screen.blit(surface, position)) for surface, position in hud
+            ]
+            self._lap("draw")
+            pygame.display.flip()
+            self._lap("flip")
+            self._count(SCREEN_WIDTH * SCREEN_HEIGHT)
+            return
+
+        background = self.background
+        previous_rects = self.sprite_rects
+        # Restore the background wherever a sprite was drawn last frame
+        for rect in previous_rects.values():
+            screen.blit(background, rect, rect)
+        previous_batch_rects = self.batch_rects
+        screen.blits(
+            [(background, rect, rect) for rect in previous_batch_rects], doreturn=False
+        )
+
+        dirty = []
+        current_rects = {}
+        for sprite in sprites:
+            rect = screen.blit(sprite.image, positions.get(sprite, sprite.rect))
+            current_rects[sprite] = rect
+            previous = previous_rects.pop(sprite, None)
+            dirty.append(rect.union(previous) if previous else rect)
+        dirty.extend(previous_rects.values())  # Sprites that went away
+        self.sprite_rects = current_rects
+        batch_rects = screen.blits(batch)
+        dirty.extend(previous_batch_rects)
+        dirty.extend(batch_rects)
+        self.batch_rects = batch_rects
+
+        # HUD entries that went away (e.g. a hidden overlay) leave the scene
+        # behind them
+        for _, previous_rect in self.hud_drawn[len(hud) :]:
+            self._rebuild(previous_rect, current_rects, batch, batch_rects)
+            dirty.append(previous_rect)
+
+        # HUD text is only pushed when it changed or a sprite touched it
+        hud_drawn = []
+        for index, (surface, position) in enumerate(hud):
+            previous_surface, previous_rect = (
+                self.hud_drawn[index] if index < len(self.hud_drawn) else (None, None)
+            )
+            rect = surface.get_rect(topleft=position)
+            touched = rect.collidelist(dirty) != -1
+            if surface is previous_surface and rect == previous_rect and not touched:
+                hud_drawn.append((surface, previous_rect))
+                continue
+            area = rect.union(previous_rect) if previous_rect else rect
+            # Rebuild the area from scratch so antialiased text never stacks
+            self._rebuild(area, current_rects, batch, batch_rects)
+            screen.set_clip(area)
+            screen.blit(surface, rect)
+            screen.set_clip(None)
+            dirty.append(area)
+            hud_drawn.append((surface, rect))
+        self.hud_drawn = hud_drawn
+
+        update_rects = []
+        pixels = 0
+        for rect in dirty:
+            rect = rect.clip(self.screen_rect)
+            if rect.width and rect.height:
+                update_rects.append(rect)
+                pixels += rect.width * rect.height
+        self._lap("draw")
+        pygame.display.update(update_rects)
+        self._lap("flip")
+        self._count(pixels)
+
+    def _rebuild(self, area, sprite_rects, batch, batch_rects):
+        # Redraws the background and this frame's sprites inside area
+        screen = self.screen
+        screen.set_clip(area)
+        screen.blit(self.background, area, area)
+        for sprite, sprite_rect in sprite_rects.items():
+            if sprite_rect.colliderect(area):
+                screen.blit(sprite.image, sprite_rect)
+        for (batch_surface, _), batch_rect in zip(batch, batch_rects):
+            if batch_rect.colliderect(area):
+                screen.blit(batch_surface, batch_rect)
+        screen.set_clip(None)
+
+
+def make_renderer(name, screen):
+    if name == "dirty":
+        return DirtyRectRenderer(screen)
+    return FullRenderer(screen)
@@ -0,0 +1,265 @@
+# Compact input recordings and max-speed replays.
+#
+# The engine is deterministic given its seed and the actions applied on each
+# tick, so a whole run fits in a few bytes per key press: the seed, every
+# SPACE/F press stamped with the tick it was applied on, and the spawn
+# schedule the run produced (tick, number value or 0 for a powerup, lane).
+# Replaying re-runs the engine headless as fast as the CPU allows and checks
+# that spawns, final score and game_over/game_won come out the same, which
+# turns captured sessions into a regression corpus for gameplay changes.
+#
+#   python main.py --record recordings/       # one .ppr file per game
+#   python replay.py recordings/              # replay and verify all of them
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import namedtuple
+
+import engine as game_engine
+from settings import NUMBER_LEVEL_BOTTOM_Y, NUMBER_LEVEL_TOP_Y
+
+MAGIC = b"PPREPLAY"
+FILE_SUFFIX = ".ppr"
+# magic, seed, sprite fingerprint, final tick, score, flags, #inputs, #spawns
+HEADER = struct.Struct("<8sqIIIBII")
+INPUT = struct.Struct("<IB")  # tick, action code
+SPAWN = struct.Struct("<IHB")  # tick, number value (0 = powerup), lane code
+
+ACTION_CODES = {game_engine.JUMP: 1, game_engine.FLIP: 2}
+ACTIONS = {code: action for action, code in ACTION_CODES.items()}
+LANE_CODES = {NUMBER_LEVEL_TOP_Y: 0, NUMBER_LEVEL_BOTTOM_Y: 1}
+GAME_OVER_FLAG = 1
+GAME_WON_FLAG = 2
+
+Recording = namedtuple(
+    "Recording",
+    [
+        "seed",
+        "fingerprint",
+        "ticks",
+        "score",
+        "game_over",
+        "game_won",
+        "inputs",
+        "spawns",
+    ],
+)
+ReplayResult = namedtuple(
+    "ReplayResult",
+    ["ok", "ticks", "seconds", "score", "game_over", "game_won", "error"],
+)
+
+
+def sprite_fingerprint(engine):
+    # Collisions depend on the sprite masks, so a recording only replays
+    # faithfully with the same player/powerup images and font
+    skin = engine.player_skin
+    parts = [
+        skin.mask_normal.get_size(),
+        skin.mask_normal.count(),
+        skin.mask_flipped.count(),
+        engine.font.get_height(),
+    ]
+    if engine.powerup_image is not None:
+        parts.append(engine.powerup_image.get_size())
+    return zlib.crc32(repr(parts).encode())
+
+
+class Recorder:
+    # Collects one run; call record() after every Engine.step
+    def __init__(self, engine):
+        self.seed = engine.seed
+        self.fingerprint = sprite_fingerprint(engine)
+        self.inputs = bytearray()
+        self.spawns = bytearray()
+        self.input_count = 0
+        self.spawn_count = 0
+
+    def record(self, tick, actions, events):
+        for action in actions:
+            self.inputs += INPUT.pack(tick, ACTION_CODES[action])
+            self.input_count += 1
+        for event in events:
+            if event.kind == game_engine.SPAWNED:
+                value, lane_y = event.value
+                self.spawns += SPAWN.pack(event.tick, value or 0, LANE_CODES[lane_y])
+                self.spawn_count += 1
+
+    def to_bytes(self, engine):
+        flags = (GAME_OVER_FLAG if engine.game_over else 0) | (
+            GAME_WON_FLAG if engine.game_won else 0
+        )
+        header = HEADER.pack(
+            MAGIC,
+            self.seed,
+            self.fingerprint,
+            engine.tick,
+            engine.score,
+            flags,
+            self.input_count,
+            self.spawn_count,
+        )
+        return header + bytes(self.inputs) + bytes(self.spawns)
+
+    def save(self, directory, engine):
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(directory, f"run-{stamp}-{self.seed:016x}{FILE_SUFFIX}")
+        with open(path, "wb") as f:
+            f.write(self.to_bytes(engine))
+        return path
+
+
+def new_seed():
+    return int.from_bytes(os.urandom(8), "little") >> 1  # Fits the signed header
+
+
+def parse(data):
+    # Raises ValueError for anything that isn't a complete recording
+    if len(data) < HEADER.size:
+        raise ValueError("truncated recording header")
+    magic, seed, fingerprint, ticks, score, flags, input_count, spawn_count = (
+        HEADER.unpack_from(data, 0)
+    )
+    if magic != MAGIC:
+        raise ValueError("not a Prime Porkour recording")
+    if len(data) != HEADER.size + input_count * INPUT.size + spawn_count * SPAWN.size:
+        raise ValueError("input/spawn sections don't match the header")
+    offset = HEADER.size
+    inputs = []
+    for tick, code in INPUT.iter_unpack(
+        data[offset : offset + input_count * INPUT.size]
+    ):
+        if code not in ACTIONS:
+            raise ValueError(f"unknown action code {code} at tick {tick}")
+        inputs.append((tick, ACTIONS[code]))
+    offset += input_count * INPUT.size
+    spawns = list(SPAWN.iter_unpack(data[offset : offset + spawn_count * SPAWN.size]))
+    return Recording(
+        seed,
+        fingerprint,
+        ticks,
+        score,
+        bool(flags & GAME_OVER_FLAG),
+        bool(flags & GAME_WON_FLAG),
+        inputs,
+        spawns,
+    )
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return parse(f.read())
+
+
+def replay(recording, engine):
+    # Re-runs the recording on engine (reset to the recorded seed) with no
+    # rendering and compares the outcome against what was recorded
+    if sprite_fingerprint(engine) != recording.fingerprint:
+        return ReplayResult(
+            False, 0, 0.0, None, None, None, "recorded with different sprites or font"
+        )
+    actions_by_tick = {}
+    for tick, action in recording.inputs:
+        actions_by_tick.setdefault(tick, []).append(action)
+    expected_spawns = recording.spawns
+    spawn_index = 0
+    error = None
+
+    started = time.perf_counter()
+    engine.reset(recording.seed)
+    no_actions = ()
+    while engine.running and engine.tick < recording.ticks:
+        events = engine.step(actions_by_tick.get(engine.tick + 1, no_actions))
+        for event in events:
+            if event.kind != game_engine.SPAWNED:
+                continue
+            value, lane_y = event.value
+            spawn = (event.tick, value or 0, LANE_CODES[lane_y])
+            if error is None and (
+                spawn_index >= len(expected_spawns)
+                or expected_spawns[spawn_index] != spawn
+            ):
+                error = f"spawn schedule diverged at tick {event.tick}"
+            spawn_index += 1
+    seconds = time.perf_counter() - started
+
+    if error is None and spawn_index != len(expected_spawns):
+        error = f"{len(expected_spawns) - spawn_index} recorded spawn(s) never happened"
+    if error is None and engine.tick != recording.ticks:
+        error = f"ended at tick {engine.tick}, recorded {recording.ticks}"
+    actual = (engine.score, engine.game_over, engine.game_won)
+    expected = (recording.score, recording.game_over, recording.game_won)
+    if error is None and actual != expected:
+        error = f"score/game_over/game_won {actual} != recorded {expected}"
+    return ReplayResult(error is None, engine.tick, seconds, *actual, error)
+
+
+def make_engine():
+    # An engine with the same sprites as the windowed game, without a display
+    import game
+    from asset_cache import load_baked_or_bake
+
+    baked = load_baked_or_bake(game.IMAGE_SOURCES, game.BAKED_ASSETS_PATH)
+    player = baked.get(game.PLAYER_IMAGE_PATH)
+    powerup = baked.get(game.GRAVITY_FLIP_POWERUP_IMAGE_PATH)
+    return game_engine.Engine(
+        player_image=player.normal if player else None,
+        player_image_flipped=player.flipped if player else None,
+        powerup_image=powerup.normal if powerup else None,
+    )
+
+
+def find_recordings(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(FILE_SUFFIX):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def replay_paths(paths):
+    # Replays every recording under paths; returns the number that failed
+    engine = make_engine()
+    failures = 0
+    total_ticks = 0
+    total_seconds = 0.0
+    for path in find_recordings(paths):
+        try:
+            recording = load(path)
+        except (OSError, ValueError) as e:
+            failures += 1
+            print(f"FAIL  {path}: {e}")
+            continue
+        result = replay(recording, engine)
+        total_ticks += result.ticks
+        total_seconds += result.seconds
+        if result.ok:
+            rate = result.ticks / max(result.seconds, 1e-9)
+            print(f"ok    {path}: {result.ticks} ticks at {rate:.0f} ticks/s")
+        else:
+            failures += 1
+            print(f"FAIL  {path}: {result.error}")
+    if total_ticks or failures:
+        print(
+            f"Replayed {total_ticks} ticks in {total_seconds:.2f} s "
+            f"({total_ticks / max(total_seconds, 1e-9):.0f} ticks/s), "
+            f"{failures} failure(s)"
+        )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay Prime Porkour recordings")
+    parser.add_argument("paths", nargs="+", help=f"{FILE_SUFFIX} files or directories")
+    options = parser.parse_args(argv)
+    return 1 if replay_paths(options.paths) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
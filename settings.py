@@ -0,0 +1,74 @@
+# Shared configuration for the windowed game (main.py) and the headless engine.
+# Everything here is a plain constant so it can be imported without touching
+# the display.
+
+# Screen dimensions
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)  # Player fallback
+GREEN_WIN = (0, 200, 0)  # For win message
+PURPLE_POWERUP = (128, 0, 128)  # Fallback for powerup sprite
+UI_TEXT_COLOR = (50, 50, 50)
+
+# Font
+FONT_SIZE = 36
+UI_FONT_SIZE = 28
+
+# --- Game Configuration ---
+GROUND_Y = SCREEN_HEIGHT - 70
+PLAYER_START_X = 100
+NUMBER_SPEED = 3
+POWERUP_SPEED = 2.5
+PLAYER_GRAVITY_STRENGTH = 0.8
+PLAYER_JUMP_STRENGTH_UP = -18
+PLAYER_JUMP_STRENGTH_DOWN = 18
+
+# Define Number spawn heights first
+NUMBER_LEVEL_BOTTOM_Y = GROUND_Y - 35
+NUMBER_LEVEL_TOP_Y = GROUND_Y - 180
+CEILING_Y = NUMBER_LEVEL_TOP_Y - 60  # Now correctly defined after NUMBER_LEVEL_TOP_Y
+
+WIN_SCORE = 3000
+
+# Difficulty Scaling Parameters
+INITIAL_SPAWN_DELAY = 1700
+MIN_SPAWN_DELAY = 600
+SPAWN_DELAY_DECREMENT = 75
+POWERUP_SPAWN_CHANCE = 0.1  # 10% chance a powerup spawns instead of a number
+
+INITIAL_MIN_NUMBER = 10
+INITIAL_MAX_NUMBER = 99
+MAX_NUMBER_CAP = 500
+MAX_NUMBER_INCREMENT = 30
+# Share of spawned numbers that are prime. None draws uniformly from the range,
+# so primes thin out as it widens; a ratio keeps it fixed (primes.py).
+PRIME_RATIO = None
+SKIP_EASY_COMPOSITES = False  # With a ratio: never spawn evens or multiples of 5
+
+DIFFICULTY_INCREASE_SCORE_INTERVAL = 200
+
+# Frame renderers selectable at startup (see render.py)
+RENDERERS = ("full", "dirty")
+
+# Where scrolling numbers live: pygame Sprites, or NumPy arrays (entities.py)
+ENTITY_STORES = ("sprites", "arrays")
+
+# --- Simulation clock ---
+# The physics constants above are per tick; the game was tuned at 60 ticks/s.
+TICKS_PER_SECOND = 60
+TICK_MS = 1000 / TICKS_PER_SECOND
+
+# --- Frenzy mode ---
+# Numbers stream in every tick across several rows between ceiling and
+# ground. Missing a prime is forgiven; touching a composite costs its value,
+# and the game is over once the score would drop below zero.
+FRENZY_SPAWN_DELAY = TICK_MS  # One number per tick
+FRENZY_LANE_COUNT = 8
+FRENZY_LANE_YS = [
+    CEILING_Y + 20 + i * (GROUND_Y - CEILING_Y - 40) // (FRENZY_LANE_COUNT - 1)
+    for i in range(FRENZY_LANE_COUNT)
+]
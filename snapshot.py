@@ -0,0 +1,239 @@
+# Compact engine snapshots, a per-tick ring of them, and rewind.
+#
+# An Engine's state is a handful of scalars, the player, the scrolling
+# numbers and powerups and the RNG. EngineState holds all of it in __slots__:
+# the scalars as plain attributes, each sprite as one flat tuple and the
+# NumPy number store (if any) as array copies. Capturing a tick copies a few
+# dozen values instead of deep-copying sprites. restore() rebuilds the
+# sprites from the pools and re-adds them in spawn order, so a restored
+# engine plays on exactly like the original.
+#
+# Random.getstate() is the one expensive part (~25 us), but the RNG only
+# moves when a spawn is planned: the spawn scheduler reuses the last captured
+# state until then (see SpawnScheduler.capture_rng).
+#
+# SnapshotRing keeps the last N ticks in preallocated EngineStates that are
+# overwritten in place, for rewinding. capture(engine) on its own makes a
+# standalone checkpoint; fingerprint() compares two states, e.g. to check that
+# replaying the same inputs from a checkpoint reaches the same state.
+from spawner import NUMBER, POWERUP, SpawnPlan
+
+STORE_FIELDS = ("x", "top", "width", "height", "value", "lane", "spawn_index", "prime")
+
+
+class EngineState:
+    __slots__ = (
+        "tick",
+        "score",
+        "game_over",
+        "game_won",
+        "player_gravity_direction",
+        "has_gravity_flip_charge",
+        "current_spawn_delay",
+        "current_min_number",
+        "current_max_number_limit",
+        "last_difficulty_increase_score",
+        "spawn_timer_ms",
+        "spawn_count",
+        "player",  # (y_float, vy, on_surface, x, y)
+        "rng",  # SpawnScheduler.capture_rng()
+        # (spawn_index, value, prime, x, top, lane_y, image, mask) per number
+        "numbers",
+        "powerups",  # (spawn_index, x_float, lane_y) per powerup
+        "store",  # {field: array} copied from entities.NumberArrays, if in use
+        "store_images",
+        "store_masks",
+    )
+
+    def __init__(self):
+        self.tick = None  # Nothing captured yet
+        self.numbers = []
+        self.powerups = []
+        self.store = None
+        self.store_images = None
+        self.store_masks = None
+
+    def fingerprint(self, spawner):
+        # Everything that decides how the game continues, as one hashable
+        # tuple; spawner resolves the RNG state planned-ahead spawns left
+        return (
+            self.tick,
+            self.score,
+            self.game_over,
+            self.game_won,
+            self.player_gravity_direction,
+            self.has_gravity_flip_charge,
+            self.current_spawn_delay,
+            self.current_min_number,
+            self.current_max_number_limit,
+            self.last_difficulty_increase_score,
+            self.spawn_timer_ms,
+            self.spawn_count,
+            self.player,
+            spawner.resolve_rng(self.rng),
+            tuple(number[:6] for number in self.numbers),  # Not the surfaces
+            tuple(self.powerups),
+            None
+            if self.store is None
+            else tuple(tuple(self.store[name].tolist()) for name in STORE_FIELDS),
+        )
+
+
+def capture(engine, state=None):
+    # Copies engine's state into state (a new EngineState by default)
+    if state is None:
+        state = EngineState()
+    state.tick = engine.tick
+    state.score = engine.score
+    state.game_over = engine.game_over
+    state.game_won = engine.game_won
+    state.player_gravity_direction = engine.player_gravity_direction
+    state.has_gravity_flip_charge = engine.has_gravity_flip_charge
+    state.current_spawn_delay = engine.current_spawn_delay
+    state.current_min_number = engine.current_min_number
+    state.current_max_number_limit = engine.current_max_number_limit
+    state.last_difficulty_increase_score = engine.last_difficulty_increase_score
+    state.spawn_timer_ms = engine.spawn_timer_ms
+    state.spawn_count = engine.spawn_count
+    player = engine.player
+    state.player = (
+        player.y_float,
+        player.vy,
+        player.on_surface,
+        player.rect.x,
+        player.rect.y,
+    )
+    state.rng = engine.spawner.capture_rng()
+    state.numbers = [
+        (
+            sprite.spawn_index,
+            sprite.value,
+            sprite.is_prime_val,
+            sprite.rect.x,
+            sprite.rect.top,
+            sprite.rect.centery,
+            sprite.image,
+            sprite.mask,
+        )
+        for sprite in engine.numbers_group
+    ]
+    state.powerups = [
+        (sprite.spawn_index, sprite.x_float, sprite.rect.centery)
+        for sprite in engine.powerups_group
+    ]
+    store = engine.number_store
+    if store is None:
+        state.store = None
+    else:
+        n = store.count
+        state.store = {name: getattr(store, name)[:n].copy() for name in STORE_FIELDS}
+        state.store_images = list(store.images)
+        state.store_masks = list(store.masks)
+    return state
+
+
+def restore(engine, state):
+    # Puts engine back into a captured state; the sprites are rebuilt.
+    # Holds the spawner lock like Engine.reset: the refill thread reads the
+    # number range and draws from the sampler
+    with engine.spawner.lock:
+        engine.tick = state.tick
+        engine.score = state.score
+        engine.game_over = state.game_over
+        engine.game_won = state.game_won
+        engine.player_gravity_direction = state.player_gravity_direction
+        engine.has_gravity_flip_charge = state.has_gravity_flip_charge
+        engine.current_spawn_delay = state.current_spawn_delay
+        engine.current_min_number = state.current_min_number
+        engine.current_max_number_limit = state.current_max_number_limit
+        engine.last_difficulty_increase_score = state.last_difficulty_increase_score
+        engine.spawn_timer_ms = state.spawn_timer_ms
+        engine.spawn_count = state.spawn_count
+        if engine.number_sampler is not None:
+            engine.number_sampler.truncate(state.current_max_number_limit)
+            engine.number_sampler.extend(state.current_max_number_limit)
+        engine.spawner.restore_rng(state.rng)
+
+        player = engine.player
+        player.y_float, player.vy, player.on_surface, x, y = state.player
+        player.use_gravity_image()
+        player.rect.topleft = (x, y)
+
+        for number_sprite in engine.numbers_group.sprites():
+            engine.release_number(number_sprite)
+        for powerup in engine.powerups_group.sprites():
+            engine.release_powerup(powerup)
+        engine.number_lanes.clear()
+        engine.powerup_lanes.clear()
+        sprites = []
+        for spawn_index, value, prime, x, top, lane_y, image, mask in state.numbers:
+            sprite = engine.number_pool.acquire(
+                SpawnPlan(NUMBER, value, prime, lane_y, x, top, image, mask, None, None)
+            )
+            sprite.spawn_index = spawn_index
+            sprites.append(sprite)
+            engine.numbers_group.add(sprite)
+            engine.number_lanes.add(sprite)
+        for spawn_index, x_float, lane_y in state.powerups:
+            sprite = engine.powerup_pool.acquire(
+                SpawnPlan(
+                    POWERUP, None, False, lane_y, x_float, None, None, None, None, None
+                )
+            )
+            sprite.spawn_index = spawn_index
+            sprites.append(sprite)
+            engine.powerups_group.add(sprite)
+            engine.powerup_lanes.add(sprite)
+        # all_sprites (the draw order) holds them in spawn order, after the player
+        if state.numbers and state.powerups:
+            sprites.sort(key=lambda sprite: sprite.spawn_index)
+        engine.all_sprites.add(sprites)
+
+        store = engine.number_store
+        if store is not None:
+            n = len(state.store["x"])
+            store.clear()
+            store.reserve(n)
+            for name in STORE_FIELDS:
+                getattr(store, name)[:n] = state.store[name]
+            store.images.extend(state.store_images)
+            store.masks.extend(state.store_masks)
+            store.count = n
+        engine.events.clear()
+
+
+class SnapshotRing:
+    # The last capacity ticks, oldest first, in reused EngineStates
+    def __init__(self, capacity):
+        self.states = [EngineState() for _ in range(capacity)]
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+
+    def record(self, engine):
+        capacity = len(self.states)
+        if self.count == capacity:
+            slot = self.start
+            self.start = (self.start + 1) % capacity
+        else:
+            slot = (self.start + self.count) % capacity
+            self.count += 1
+        return capture(engine, self.states[slot])
+
+    def rewind(self, engine, ticks):
+        # Restores the snapshot taken ticks snapshots before the latest one
+        # (or the oldest kept) and forgets everything after it. Returns the
+        # restored state, or None if the ring is empty.
+        if not self.count:
+            return None
+        back = min(ticks, self.count - 1)
+        self.count -= back
+        state = self.states[(self.start + self.count - 1) % len(self.states)]
+        restore(engine, state)
+        return state
@@ -0,0 +1,290 @@
+# Long-running soak test.
+#
+# Kiosks run the game for days, cycling through reset_game after every game.
+# The soak test does the same unattended: it plays the real windowed game
+# (under SDL's dummy video and audio drivers unless told otherwise) with
+# random SPACE / F presses, restarts straight away on game over and on a win
+# instead of waiting on the end screens, and stops after --duration seconds.
+#
+# Every --interval seconds SoakMonitor samples the process RSS, the memory
+# traced by tracemalloc and its top allocators since the first sample, the
+# sprite group sizes, the sprites the pools ever created, the objects tracked
+# by the garbage collector and the collector's generation counts, and the
+# time spent per frame. At the end a series counts as growing without bound
+# when, after a warm-up, even its lowest value in the last quarter of the run
+# is above its highest in the first quarter (plus some slack for noise).
+# Sawtooth series that drop back on every restart never trip this. Any
+# growth fails the run with a report.
+#
+#   python soak.py --duration 14400 --interval 60
+#   python soak.py --duration 600 -- --entity-store arrays  # game options
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from profiler import percentile
+
+DEFAULT_DURATION = 3600  # Seconds
+DEFAULT_INTERVAL = 60  # Seconds between samples
+DEFAULT_TOP = 10  # Allocators listed in the report
+JUMP_CHANCE = 0.05  # Per frame, for the random player
+FLIP_CHANCE = 0.03
+WARMUP_FRACTION = 0.2  # Samples ignored while caches and pools fill up
+MIN_SAMPLES = 8  # After the warm-up; fewer can't tell growth from noise
+
+# How far above its early peak a series' late floor may sit and still count
+# as bounded
+GROWTH_SLACK = {
+    "rss_kb": 4096,
+    "traced_kb": 1024,
+    "all_sprites": 5,
+    "numbers_group": 5,
+    "powerups_group": 2,
+    "number_store": 5,
+    "pooled_sprites": 5,
+    "gc_objects": 2000,
+    "gc_gen0": 1000,
+    "frame_p99_ms": 2.0,
+}
+
+
+def current_rss_kb():
+    # Resident set size; None where it can't be read
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Peak, not current
+
+
+def find_growth(values, slack, warmup=WARMUP_FRACTION):
+    # (early peak, late floor) if values grow without bound, else None
+    values = [
+        value for value in values[int(len(values) * warmup) :] if value is not None
+    ]
+    if len(values) < MIN_SAMPLES:
+        return None
+    window = len(values) // 4
+    early_peak = max(values[:window])
+    late_floor = min(values[-window:])
+    if late_floor > early_peak + slack:
+        return early_peak, late_floor
+    return None
+
+
+class SoakMonitor:
+    def __init__(self, interval=DEFAULT_INTERVAL, top=DEFAULT_TOP, trace=True):
+        self.interval = interval
+        self.top = top
+        self.trace = trace
+        self.started_at = time.perf_counter()
+        self.next_sample_at = self.started_at
+        self.samples = []
+        self.frame_times = []  # Seconds per frame since the last sample
+        self.baseline = None  # First tracemalloc snapshot
+        self.top_allocators = []  # Latest comparison against the baseline
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def frame(self, seconds):
+        self.frame_times.append(seconds)
+
+    def due(self, now):
+        return now >= self.next_sample_at
+
+    def sample(self, game, now=None):
+        now = time.perf_counter() if now is None else now
+        self.next_sample_at = now + self.interval
+        engine = game.engine
+        frame_times = sorted(self.frame_times)
+        self.frame_times.clear()
+        store = engine.number_store
+        gc_count = gc.get_count()
+        record = {
+            "elapsed": now - self.started_at,
+            "games": game.games_played,
+            "rss_kb": current_rss_kb(),
+            "traced_kb": None,
+            "all_sprites": len(engine.all_sprites),
+            "numbers_group": len(engine.numbers_group),
+            "powerups_group": len(engine.powerups_group),
+            "number_store": 0 if store is None else store.count,
+            "pooled_sprites": engine.number_pool.created + engine.powerup_pool.created,
+            "gc_objects": len(gc.get_objects()) + gc.get_freeze_count(),
+            "gc_gen0": gc_count[0],
+            "gc_count": gc_count,
+            "gc_collections": tuple(stats["collections"] for stats in gc.get_stats()),
+            "frames": len(frame_times),
+            "frame_p50_ms": percentile(frame_times, 0.5) * 1000,
+            "frame_p99_ms": percentile(frame_times, 0.99) * 1000
+            if frame_times
+            else None,
+            "frame_max_ms": frame_times[-1] * 1000 if frame_times else 0.0,
+        }
+        if self.trace:
+            record["traced_kb"] = tracemalloc.get_traced_memory()[0] // 1024
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+            if self.baseline is None:
+                self.baseline = snapshot
+            else:
+                self.top_allocators = snapshot.compare_to(self.baseline, "lineno")[
+                    : self.top
+                ]
+        self.samples.append(record)
+        return record
+
+    def growth(self):
+        # {metric: (early peak, late floor)} for every series that kept growing
+        found = {}
+        for metric, slack in GROWTH_SLACK.items():
+            result = find_growth([s[metric] for s in self.samples], slack)
+            if result is not None:
+                found[metric] = result
+        return found
+
+    def report(self):
+        # The report as a list of lines
+        lines = [
+            f"{'time':>8} {'games':>6} {'rss MB':>8} {'traced MB':>9} "
+            f"{'sprites':>7} {'numbers':>7} {'powerups':>8} {'gc objs':>8} "
+            f"{'gc count':>16} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7}"
+        ]
+        for s in self.samples:
+            rss = "-" if s["rss_kb"] is None else f"{s['rss_kb'] / 1024:.1f}"
+            traced = "-" if s["traced_kb"] is None else f"{s['traced_kb'] / 1024:.1f}"
+            p99 = "-" if s["frame_p99_ms"] is None else f"{s['frame_p99_ms']:.2f}"
+            lines.append(
+                f"{s['elapsed']:8.0f} {s['games']:6d} {rss:>8} {traced:>9} "
+                f"{s['all_sprites']:7d} {s['numbers_group'] + s['number_store']:7d} "
+                f"{s['powerups_group']:8d} {s['gc_objects']:8d} "
+                f"{str(s['gc_count']):>16} {s['frame_p50_ms']:7.2f} {p99:>7} "
+                f"{s['frame_max_ms']:7.2f}"
+            )
+        if self.samples:
+            collections = self.samples[-1]["gc_collections"]
+            lines.append(f"GC collections per generation: {collections}")
+        if self.top_allocators:
+            lines.append("Top allocators since the first sample:")
+            lines.extend(f"  {stat}" for stat in self.top_allocators)
+        growth = self.growth()
+        for metric, (early_peak, late_floor) in growth.items():
+            lines.append(
+                f"GROWING: {metric} never fell below {late_floor} in the last "
+                f"quarter of the run, up from a peak of {early_peak} early on"
+            )
+        if not growth:
+            lines.append(f"No unbounded growth across {len(self.samples)} samples")
+        return lines
+
+
+def make_soak_game(options, monitor, duration, seed=0):
+    # Deferred: pulls in pygame, which must see the SDL drivers chosen in main()
+    from engine import FLIP, JUMP
+    from game import Game
+
+    class SoakGame(Game):
+        # The real game loop with a random player and no end screens
+        def __init__(self):
+            super().__init__(options)
+            self.monitor = monitor
+            self.deadline = time.perf_counter() + duration
+            self.player_rng = random.Random(seed)
+            self.games_played = 0
+            self.games_won = 0
+
+        def end_game(self):
+            # Restart on the spot, like a kiosk left alone
+            self.save_recording()
+            self.games_played += 1
+            self.games_won += self.engine.game_won
+            self.reset_game()
+
+        def handle_input(self):
+            super().handle_input()
+            if self.engine.running:
+                roll = self.player_rng.random()
+                if roll < JUMP_CHANCE:
+                    self.pending_actions.append(JUMP)
+                elif roll < JUMP_CHANCE + FLIP_CHANCE:
+                    self.pending_actions.append(FLIP)
+
+        def run_frame(self):
+            now = time.perf_counter()
+            if now >= self.deadline:
+                self.monitor.sample(self, now)
+                self.running = False
+                return
+            if self.monitor.due(now):
+                self.monitor.sample(self, now)
+                now = time.perf_counter()  # Sampling isn't frame time
+            super().run_frame()
+            self.monitor.frame(time.perf_counter() - now)
+
+    return SoakGame()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prime Porkour soak test",
+        epilog="arguments after -- are passed to the game (see main.py --help)",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=DEFAULT_DURATION, help="seconds to run"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help="seconds between samples",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random player seed")
+    parser.add_argument(
+        "--top", type=int, default=DEFAULT_TOP, help="allocators to report"
+    )
+    parser.add_argument(
+        "--no-tracemalloc",
+        dest="trace",
+        action="store_false",
+        help="skip tracemalloc (it slows every allocation down)",
+    )
+    parser.add_argument(
+        "--display",
+        action="store_true",
+        help="use the real video and audio drivers instead of SDL's dummy ones",
+    )
+    options, game_args = parser.parse_known_args(argv)
+    if game_args and game_args[0] == "--":
+        game_args = game_args[1:]
+    if not options.display:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    from main import parse_args
+
+    game_options = parse_args(game_args)
+    monitor = SoakMonitor(options.interval, options.top, options.trace)
+    game = make_soak_game(game_options, monitor, options.duration, options.seed)
+    game.run()
+    print(
+        f"Soak: {game.games_played} games ({game.games_won} won) in "
+        f"{options.duration:.0f} s"
+    )
+    for line in monitor.report():
+        print(line)
+    return 1 if monitor.growth() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+# Look-ahead spawn scheduler.
+#
+# A spawn used to roll the powerup chance, draw a value and a lane, test the
+# value for primality and fetch its glyph right on the tick it fired.
+# SpawnScheduler does that work ahead of time: upcoming spawns are planned
+# into a small ring buffer, optionally topped up by a background thread, so
+# a spawning tick only pops a finished SpawnPlan.
+#
+# Plans are drawn from the engine's RNG in exactly the order the old code
+# drew them, so seeded games play out the same. When something a plan depends
+# on changes (the number range on a difficulty increase, a reset) the buffer
+# is invalidated: the RNG is rewound to the first unused plan and planning
+# starts over. The one thing a plan cannot know ahead of time is whether the
+# player will be holding a flip charge, which turns a powerup roll into a
+# number; that case rewinds to just after the roll and plans the number on
+# the spot.
+#
+# Random.getstate() costs tens of microseconds, so plans don't each carry a
+# state. The scheduler keeps one base state plus the plans popped since, and
+# rewinds by restoring the base and re-drawing those plans' random numbers.
+# With nothing buffered (no background thread) a spawn simply draws on the
+# spot and none of this bookkeeping happens.
+import random
+import threading
+from collections import deque, namedtuple
+
+from primes import is_prime
+from settings import (
+    BLACK,
+    FRENZY_LANE_YS,
+    NUMBER_LEVEL_BOTTOM_Y,
+    NUMBER_LEVEL_TOP_Y,
+    SCREEN_WIDTH,
+)
+
+NUMBER = "number"
+POWERUP = "powerup"
+POWERUP_LANE_YS = [NUMBER_LEVEL_TOP_Y, NUMBER_LEVEL_BOTTOM_Y]
+DEFAULT_CAPACITY = 16
+
+# x is the spawn x (a float for powerups) and top the rect top for numbers.
+# low / high is the number range a number was drawn from.
+SpawnPlan = namedtuple(
+    "SpawnPlan",
+    [
+        "kind",
+        "value",
+        "prime",
+        "lane_y",
+        "x",
+        "top",
+        "image",
+        "mask",
+        "low",
+        "high",
+    ],
+)
+
+
+class SpawnScheduler:
+    def __init__(self, engine, capacity=DEFAULT_CAPACITY):
+        self.engine = engine
+        self.capacity = capacity
+        if engine.frenzy:
+            self.lane_ys = FRENZY_LANE_YS
+        else:
+            self.lane_ys = [NUMBER_LEVEL_TOP_Y, NUMBER_LEVEL_BOTTOM_Y]
+        self.buffer = deque()
+        # RNG state the buffered plans start from, followed by the plans
+        # popped since. None while nothing is buffered: the RNG itself is
+        # then exactly where the next plan starts.
+        self.base_state = None
+        self.history = []
+        # Bumped whenever the RNG moves, so capture_rng() can skip getstate()
+        # while it hasn't (see snapshot.py)
+        self.epoch = 0
+        self.captured = None
+        self.captured_epoch = None
+        # Guards the engine's RNG, glyph cache and this buffer; the engine
+        # takes it too whenever it changes what plans depend on
+        self.lock = threading.RLock()
+        self.refill_needed = threading.Condition(self.lock)
+        self.worker = None
+        self.stopping = False
+        self.planned = 0
+        self.popped = 0
+        self.planned_on_demand = 0  # Buffer was empty when a spawn fired
+        self.invalidations = 0
+        self.discarded = 0  # Plans thrown away by invalidation
+
+    # --- Planning (always called with the lock held) ---
+    def number_plan(self, value, lane_y, x, low=None, high=None):
+        engine = self.engine
+        image, mask = engine.glyphs.get(value, engine.font, BLACK)
+        top = image.get_rect(centery=lane_y).top
+        return SpawnPlan(
+            NUMBER,
+            value,
+            is_prime(value),
+            lane_y,
+            x,
+            top,
+            image,
+            mask,
+            low,
+            high,
+        )
+
+    def plan_number(self):
+        engine = self.engine
+        rng = engine.rng
+        low, high = engine.current_min_number, engine.current_max_number_limit
+        if engine.number_sampler is not None:
+            value = engine.number_sampler.draw(rng)
+        else:
+            value = rng.randint(low, high)
+        lane_y = rng.choice(self.lane_ys)
+        x = SCREEN_WIDTH + rng.randrange(50, 200)  # Spawn off-screen right
+        return self.number_plan(value, lane_y, x, low, high)
+
+    def plan_powerup(self):
+        rng = self.engine.rng
+        x = float(SCREEN_WIDTH + rng.randrange(100, 300))
+        lane_y = rng.choice(POWERUP_LANE_YS)
+        return SpawnPlan(POWERUP, None, False, lane_y, x, None, None, None, None, None)
+
+    def plan_next(self, holding_charge=False):
+        # Plans ahead of time assume no flip charge; pop() fixes that up
+        engine = self.engine
+        self.planned += 1
+        self.epoch += 1
+        if (
+            engine.rng.random() < engine.rules.powerup_spawn_chance
+            and not holding_charge
+        ):
+            return self.plan_powerup()
+        return self.plan_number()
+
+    def redraw(self, plan, rng=None):
+        # Repeats the random draws that produced plan, without the rest
+        rng = rng or self.engine.rng
+        rng.random()
+        if plan.kind == POWERUP:
+            rng.randrange(100, 300)
+            rng.choice(POWERUP_LANE_YS)
+        else:
+            if self.engine.number_sampler is not None:
+                self.engine.number_sampler.redraw(rng, plan.high)
+            else:
+                rng.randint(plan.low, plan.high)
+            rng.choice(self.lane_ys)
+            rng.randrange(50, 200)
+
+    def buffer_plan(self):
+        if self.base_state is None:
+            self.base_state = self.engine.rng.getstate()
+        self.buffer.append(self.plan_next())
+
+    def fill(self, count=None):
+        with self.lock:
+            target = self.capacity if count is None else count
+            while len(self.buffer) < target:
+                self.buffer_plan()
+
+    def rebase(self):
+        # Moves base_state past the popped plans, leaving the RNG as it was
+        with self.lock:
+            if self.base_state is None:
+                return
+            rng = self.engine.rng
+            current = rng.getstate()
+            rng.setstate(self.base_state)
+            for plan in self.history:
+                self.redraw(plan)
+            self.base_state = rng.getstate()
+            self.history.clear()
+            rng.setstate(current)
+
+    # --- Used by the engine ---
+    def pop(self, holding_charge):
+        with self.lock:
+            self.popped += 1
+            if not self.buffer:
+                # Nothing planned: draw it now, exactly like a plain spawn
+                self.planned_on_demand += 1
+                plan = self.plan_next(holding_charge)
+            else:
+                plan = self.buffer.popleft()
+                if plan.kind == POWERUP and holding_charge:
+                    # Only spawn a powerup if no charge is held: the roll
+                    # stands, but everything drawn after it becomes a number
+                    self.buffer.appendleft(plan)
+                    self.rewind()
+                    self.engine.rng.random()
+                    plan = self.plan_number()
+                elif self.buffer:
+                    self.history.append(plan)
+                else:
+                    self.base_state = None  # The RNG is past everything planned
+                    self.history.clear()
+            if self.worker is None and len(self.history) >= self.capacity:
+                self.rebase()  # Otherwise the worker does it between spawns
+            self.refill_needed.notify()
+            return plan
+
+    def rewind(self):
+        # Drops every unused plan and puts the RNG back where they started
+        with self.lock:
+            if self.buffer:
+                self.discarded += len(self.buffer)
+                self.buffer.clear()
+                rng = self.engine.rng
+                rng.setstate(self.base_state)
+                for plan in self.history:
+                    self.redraw(plan)
+                self.epoch += 1
+            self.base_state = None
+            self.history.clear()
+            self.refill_needed.notify()
+
+    def invalidate(self):
+        # Plans drawn so far are void (e.g. the number range changed)
+        with self.lock:
+            self.rewind()
+            self.invalidations += 1
+
+    def reset(self):
+        # The engine reseeded its RNG: nothing planned or popped counts
+        with self.lock:
+            self.epoch += 1
+            self.buffer.clear()
+            self.base_state = None
+            self.history.clear()
+            self.refill_needed.notify()
+
+    def capture_rng(self):
+        # Where the RNG would be if nothing had been planned ahead: a state
+        # plus the popped plans to redraw on top of it
+        with self.lock:
+            if self.buffer:
+                return self.base_state, tuple(self.history)
+            if self.captured_epoch != self.epoch:
+                self.captured = (self.engine.rng.getstate(), ())
+                self.captured_epoch = self.epoch
+            return self.captured
+
+    def resolve_rng(self, captured):
+        # The plain RNG state a capture_rng() result stands for
+        state, popped = captured
+        if not popped:
+            return state
+        with self.lock:
+            scratch = random.Random()
+            scratch.setstate(state)
+            for plan in popped:
+                self.redraw(plan, scratch)
+            return scratch.getstate()
+
+    def restore_rng(self, captured):
+        # Puts the RNG back to a capture_rng() result; plans are void
+        with self.lock:
+            self.discarded += len(self.buffer)
+            self.buffer.clear()
+            self.base_state = None
+            self.history.clear()
+            state, popped = captured
+            self.engine.rng.setstate(state)
+            for plan in popped:
+                self.redraw(plan)
+            self.epoch += 1
+            if not popped:
+                self.captured, self.captured_epoch = captured, self.epoch
+            self.refill_needed.notify()
+
+    # --- Background refill ---
+    def start(self):
+        if self.worker is not None:
+            return
+        self.stopping = False
+        self.worker = threading.Thread(
+            target=self._refill_loop, name="spawn-scheduler", daemon=True
+        )
+        self.worker.start()
+
+    def stop(self):
+        if self.worker is None:
+            return
+        with self.lock:
+            self.stopping = True
+            self.refill_needed.notify()
+        self.worker.join()
+        self.worker = None
+
+    def _refill_loop(self):
+        # Plans one spawn per lock hold, so a spawning tick never waits long
+        while True:
+            with self.lock:
+                while (
+                    not self.stopping
+                    and len(self.buffer) >= self.capacity
+                    and len(self.history) < self.capacity
+                ):
+                    self.refill_needed.wait()
+                if self.stopping:
+                    return
+                if len(self.history) >= self.capacity:
+                    self.rebase()
+                else:
+                    self.buffer_plan()
+
+    def stats(self):
+        return {
+            "planned": self.planned,
+            "popped": self.popped,
+            "planned_on_demand": self.planned_on_demand,
+            "invalidations": self.invalidations,
+            "discarded": self.discarded,
+        }
@@ -0,0 +1,117 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the parent directory to the Python path to allow importing asset_cache
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame  # noqa: E402
+
+from asset_cache import BakedAssets, bake, load_baked_or_bake  # noqa: E402
+from engine import Engine  # noqa: E402
+
+
+def write_png(path, color):
+    image = pygame.Surface((20, 40), pygame.SRCALPHA)
+    image.fill(color)
+    image.fill((0, 0, 0, 0), (0, 0, 20, 10))  # Transparent top band
+    pygame.image.save(image, path)
+
+
+class TestAssetCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.image_path = os.path.join(self.directory.name, "pig.png")
+        self.cache_path = os.path.join(self.directory.name, "baked", "sprites.baked")
+        write_png(self.image_path, (200, 100, 50, 255))
+        self.sources = [(self.image_path, 80)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_baked_variants_match_fresh_transforms(self):
+        bake(self.sources, self.cache_path)
+        cache = BakedAssets(self.cache_path)
+        baked = cache.get(self.image_path, 80)
+        cache.close()
+
+        scaled = pygame.transform.scale(pygame.image.load(self.image_path), (40, 80))
+        flipped = pygame.transform.flip(scaled, False, True)
+        self.assertEqual(baked.normal.get_size(), (40, 80))
+        self.assertEqual(
+            pygame.image.tobytes(baked.normal, "RGBA"),
+            pygame.image.tobytes(scaled, "RGBA"),
+        )
+        self.assertEqual(
+            pygame.image.tobytes(baked.flipped, "RGBA"),
+            pygame.image.tobytes(flipped, "RGBA"),
+        )
+
+    def test_changed_source_or_size_misses(self):
+        bake(self.sources, self.cache_path)
+        cache = BakedAssets(self.cache_path)
+        self.assertIsNone(cache.get(self.image_path, 60))
+        write_png(self.image_path, (10, 20, 30, 255))
+        self.assertIsNone(cache.get(self.image_path, 80))
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        cache.close()
+
+    def test_load_bakes_on_miss_then_hits(self):
+        self.assertFalse(os.path.exists(self.cache_path))
+        first = load_baked_or_bake(self.sources, self.cache_path)
+        self.assertTrue(os.path.exists(self.cache_path))
+        second = load_baked_or_bake(self.sources, self.cache_path)
+        self.assertEqual(
+            pygame.image.tobytes(first[self.image_path].flipped, "RGBA"),
+            pygame.image.tobytes(second[self.image_path].flipped, "RGBA"),
+        )
+
+    def test_damaged_cache_is_rebaked(self):
+        bake(self.sources, self.cache_path)
+        with open(self.cache_path, "rb") as f:
+            data = f.read()
+        header_end = data.index(b"}") + 1
+        damaged = {
+            "short": data[:7],
+            "truncated header": data[:20],
+            "truncated pixels": data[: header_end + 100],
+            "bad index": data[:12] + b"[" * (header_end - 12) + data[header_end:],
+        }
+        for name, contents in damaged.items():
+            with self.subTest(damage=name):
+                with open(self.cache_path, "wb") as f:
+                    f.write(contents)
+                cache = BakedAssets(self.cache_path)
+                self.assertEqual(cache.index, {})
+                self.assertIsNone(cache.get(self.image_path, 80))
+                cache.close()
+                images = load_baked_or_bake(self.sources, self.cache_path)
+                self.assertEqual(images[self.image_path].normal.get_size(), (40, 80))
+                with open(self.cache_path, "rb") as f:
+                    self.assertEqual(f.read(), data)
+
+    def test_missing_source_is_skipped(self):
+        missing = os.path.join(self.directory.name, "nope.png")
+        images = load_baked_or_bake([(missing, 30)], self.cache_path)
+        self.assertIsNone(images[missing])
+
+    def test_engine_reuses_precomputed_masks_on_flip(self):
+        baked = load_baked_or_bake(self.sources, self.cache_path)[self.image_path]
+        engine = Engine(
+            seed=1, player_image=baked.normal, player_image_flipped=baked.flipped
+        )
+        player = engine.player
+        normal_mask = player.mask
+        engine.has_gravity_flip_charge = True
+        player.attempt_flip_gravity()
+        self.assertIs(player.image, baked.flipped)
+        self.assertIs(player.mask, engine.player_skin.mask_flipped)
+        self.assertIsNot(player.mask, normal_mask)
+        # The transparent band ends up at the bottom of the flipped mask
+        self.assertEqual(player.mask.get_at((5, 0)), 1)
+        self.assertEqual(player.mask.get_at((5, 79)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the parent directory to the Python path to allow importing balance
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import balance  # noqa: E402
+import engine  # noqa: E402
+
+
+def small_sweep(**overrides):
+    sweep = {
+        "grid": balance.parse_grid(["initial_spawn_delay=1000,1700"]),
+        "policies": ["idle", "lookahead"],
+        "games": 4,
+        "seed": 0,
+        "chunk": 3,
+        "max_ticks": 1200,
+    }
+    sweep.update(overrides)
+    return sweep
+
+
+class TestBalance(unittest.TestCase):
+    def test_grid_defaults_to_settings(self):
+        grid = balance.parse_grid(["win_score=100,200", "powerup_spawn_chance=0.5"])
+        self.assertEqual(grid["win_score"], [100, 200])
+        self.assertEqual(grid["powerup_spawn_chance"], [0.5])
+        self.assertEqual(
+            grid["initial_spawn_delay"], [engine.DEFAULT_RULES.initial_spawn_delay]
+        )
+        self.assertEqual(len(balance.grid_points(grid)), 2)
+        with self.assertRaises(ValueError):
+            balance.parse_grid(["gravity=2"])
+        grid = balance.parse_grid(["prime_ratio=none,0.5", "skip_easy_composites=true"])
+        self.assertEqual(grid["prime_ratio"], [None, 0.5])
+        self.assertEqual(grid["skip_easy_composites"], [True])
+
+    def test_rules_change_the_game(self):
+        rules = engine.DEFAULT_RULES._replace(win_score=50)
+        result = balance.play_chunk((rules._asdict(), "lookahead", 0, 5, 20000))
+        self.assertEqual(result["wins"], 5)
+
+    def test_chunk_is_deterministic(self):
+        task = (engine.DEFAULT_RULES._asdict(), "random", 7, 3, 3000)
+        first = balance.play_chunk(task)
+        second = balance.play_chunk(task)
+        for field in ("wins", "deaths", "scores", "ticks"):
+            self.assertEqual(first[field], second[field])
+
+    def test_chunks_cover_every_game_once(self):
+        tasks = balance.make_tasks(small_sweep())
+        self.assertEqual(len(tasks), 2 * 2 * 2)  # points * policies * chunks
+        self.assertEqual(sum(task[3] for task in tasks), 2 * 2 * 4)
+
+    def test_resume_skips_finished_chunks_and_matches(self):
+        with tempfile.TemporaryDirectory() as output:
+            full = balance.run_sweep(small_sweep(), output, workers=1)
+            results_path = os.path.join(output, balance.RESULTS_FILENAME)
+            with open(results_path) as f:
+                lines = f.readlines()
+            # Simulate a run killed while writing its third chunk
+            with open(results_path, "w") as f:
+                f.writelines(lines[:2])
+                f.write(lines[2][:10])
+            resumed = balance.run_sweep(small_sweep(), output, workers=1)
+            self.assertEqual(len(balance.load_results(results_path)), len(lines))
+            self.assertEqual(full, resumed)
+
+            with self.assertRaises(ValueError):
+                balance.run_sweep(small_sweep(games=8), output, workers=1)
+
+    def test_survival_curve_is_monotonic(self):
+        task = (engine.DEFAULT_RULES._asdict(), "idle", 0, 10, 5000)
+        (entry,) = balance.summarize([balance.play_chunk(task)])
+        self.assertEqual(entry["games"], 10)
+        self.assertEqual(entry["survival"][-1], 0.0)  # Idle never survives
+        self.assertEqual(entry["survival"], sorted(entry["survival"], reverse=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
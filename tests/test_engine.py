@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing the engine
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame  # noqa: E402
+
+import engine  # noqa: E402
+
+
+def run_scripted_game(seed, max_ticks=5000):
+    game = engine.Engine(seed=seed)
+    kinds = []
+    while game.running and game.tick < max_ticks:
+        actions = [engine.JUMP] if game.tick % 45 == 0 else []
+        kinds.extend(event.kind for event in game.step(actions))
+    return game, kinds
+
+
+class TestEngine(unittest.TestCase):
+    def test_runs_without_display(self):
+        run_scripted_game(seed=3, max_ticks=600)
+        self.assertFalse(pygame.display.get_init())
+
+    def test_same_seed_same_game(self):
+        game_a, kinds_a = run_scripted_game(seed=42)
+        game_b, kinds_b = run_scripted_game(seed=42)
+        self.assertEqual(game_a.tick, game_b.tick)
+        self.assertEqual(game_a.score, game_b.score)
+        self.assertEqual(kinds_a, kinds_b)
+
+    def test_jump_leaves_ground(self):
+        game = engine.Engine(seed=0)
+        start_y = game.player.rect.y
+        game.step([engine.JUMP])
+        self.assertLess(game.player.rect.y, start_y)
+        self.assertFalse(game.player.on_surface)
+
+    def test_spawn_follows_delay(self):
+        game = engine.Engine(seed=0)
+        ticks_per_spawn = int(game.current_spawn_delay // (1000 / 60)) + 1
+        for _ in range(ticks_per_spawn - 1):
+            game.step()
+        self.assertEqual(len(game.all_sprites), 1)  # Only the player
+        game.step()
+        self.assertEqual(len(game.all_sprites), 2)
+
+    def test_step_after_game_over_is_noop(self):
+        game, _ = run_scripted_game(seed=7)
+        self.assertFalse(game.running)
+        tick = game.tick
+        self.assertEqual(game.step([engine.JUMP]), [])
+        self.assertEqual(game.tick, tick)
+
+
+if __name__ == "__main__":
+    unittest.main()
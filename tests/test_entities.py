@@ -0,0 +1,134 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing entities
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame  # noqa: E402
+
+import engine  # noqa: E402
+from settings import NUMBER_LEVEL_TOP_Y  # noqa: E402
+
+try:
+    from entities import NumberArrays  # noqa: E402
+except ImportError:  # NumPy is optional
+    NumberArrays = None
+
+
+def numbers_ahead(game):
+    # (left, centery, is_prime) for every number, whichever store is in use
+    store = game.number_store
+    if store is None:
+        return [
+            (s.rect.left, s.rect.centery, s.is_prime_val) for s in game.numbers_group
+        ]
+    return [
+        (
+            int(store.x[i]),
+            int(store.top[i] + store.height[i] // 2),
+            bool(store.prime[i]),
+        )
+        for i in range(store.count)
+    ]
+
+
+def play(seed, entity_store, max_ticks=3000):
+    game = engine.Engine(seed=seed, entity_store=entity_store)
+    events = []
+    while game.running and game.tick < max_ticks:
+        actions = []
+        for left, centery, prime in numbers_ahead(game):
+            if 0 <= left - game.player.rect.right <= 40:
+                if (centery == NUMBER_LEVEL_TOP_Y) == prime:
+                    actions.append(engine.JUMP)
+                    break
+        if game.tick % 301 == 0:
+            actions.append(engine.FLIP)
+        events.extend(game.step(actions))
+    return game.tick, game.score, game.game_over, game.game_won, events
+
+
+@unittest.skipIf(NumberArrays is None, "NumPy is not installed")
+class TestNumberArrays(unittest.TestCase):
+    def setUp(self):
+        self.image = pygame.Surface((20, 10))
+        self.mask = pygame.mask.from_surface(self.image)
+
+    def add(self, store, value, x, lane_y=100, spawn_index=0):
+        store.add(
+            value,
+            value in (2, 3, 5, 7),
+            lane_y,
+            x,
+            lane_y - 5,
+            self.image,
+            self.mask,
+            spawn_index,
+        )
+
+    def test_grows_and_keeps_contents(self):
+        store = NumberArrays([100, 200], capacity=2)
+        for i in range(5):
+            self.add(store, i, x=i * 10, spawn_index=i)
+        self.assertEqual(len(store), 5)
+        self.assertGreaterEqual(store.capacity, 5)
+        self.assertEqual(store.x[:5].tolist(), [0, 10, 20, 30, 40])
+
+    def test_advance_offscreen_and_remove(self):
+        store = NumberArrays([100, 200])
+        self.add(store, 4, x=5, lane_y=200)
+        self.add(store, 6, x=0, lane_y=100)
+        self.add(store, 8, x=500)
+        store.advance(30)
+        gone = store.offscreen()
+        # Top lane first, like the sprite lane index
+        self.assertEqual(store.value[gone].tolist(), [6, 4])
+        store.remove(gone)
+        self.assertEqual(len(store), 1)
+        self.assertEqual((store.value[0], store.x[0]), (8, 470))
+        self.assertEqual(len(store.images), 1)
+
+    def test_overlapping_in_spawn_order(self):
+        store = NumberArrays([100, 200])
+        self.add(store, 3, x=50, spawn_index=7)
+        self.add(store, 5, x=45, spawn_index=2)
+        self.add(store, 9, x=300, spawn_index=1)
+        hits = store.overlapping(pygame.Rect(40, 90, 30, 30))
+        self.assertEqual(store.value[hits].tolist(), [5, 3])
+
+    def test_blit_sequence(self):
+        store = NumberArrays([100, 200])
+        self.add(store, 3, x=50)
+        self.assertEqual(store.blit_sequence(2), [(self.image, (52, 95))])
+
+
+@unittest.skipIf(NumberArrays is None, "NumPy is not installed")
+class TestArrayEngine(unittest.TestCase):
+    def test_arrays_play_the_same_game_as_sprites(self):
+        for seed in range(6):
+            with self.subTest(seed=seed):
+                self.assertEqual(play(seed, "sprites"), play(seed, "arrays"))
+
+    def test_frenzy_forgives_missed_primes(self):
+        game = engine.Engine(seed=1, frenzy=True)
+        kinds = set()
+        for _ in range(900):  # Idle player: numbers only scroll past
+            kinds.update(event.kind for event in game.step())
+        self.assertGreater(len(game.number_store), 200)
+        self.assertNotIn(engine.PRIME_MISSED, kinds)
+
+    def test_frenzy_composites_cost_their_value(self):
+        game = engine.Engine(seed=1, frenzy=True)
+        game.score = 1000
+        penalties = []
+        while game.running and game.tick < 3000:
+            for event in game.step([engine.JUMP]):
+                if event.kind == engine.PENALTY:
+                    penalties.append(event.value)
+        self.assertTrue(penalties)
+        self.assertTrue(game.game_over or game.score >= 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+import threading
+
+# Add the parent directory to the Python path to allow importing event_log
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from event_log import EventLog  # noqa: E402
+
+
+class BlockingStream(io.StringIO):
+    # Holds the writer thread in its first write until released
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.entered.set()
+        self.release.wait()
+        return super().write(text)
+
+
+class TestEventLog(unittest.TestCase):
+    def test_writes_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "events.jsonl")
+            log = EventLog(path=path)
+            log.log("collected_prime", tick=10, value=7)
+            log.log("game_over", tick=20)
+            log.close()
+            with open(path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual(
+            [r["event"] for r in records], ["collected_prime", "game_over"]
+        )
+        self.assertEqual(records[0]["tick"], 10)
+        self.assertEqual(records[0]["value"], 7)
+        stats = log.stats()
+        self.assertEqual(stats["logged"], 2)
+        self.assertEqual(stats["written"], 2)
+        self.assertEqual(stats["dropped"], 0)
+
+    def test_formatter_can_skip_records(self):
+        stream = io.StringIO()
+        log = EventLog(
+            stream=stream,
+            formatter=lambda r: None if r["event"] == "quiet" else r["event"],
+        )
+        log.log("loud")
+        log.log("quiet")
+        log.close()
+        self.assertEqual(stream.getvalue(), "loud\n")
+
+    def fill_while_blocked(self, policy):
+        # The writer is stuck writing "first" while eight more records arrive
+        stream = BlockingStream()
+        log = EventLog(
+            stream=stream,
+            formatter=lambda r: r["event"],
+            capacity=4,
+            batch_size=1,
+            policy=policy,
+        )
+        log.log("first")
+        self.assertTrue(stream.entered.wait(5))
+        for i in range(8):
+            log.log("a" if i < 6 else "b")
+        stream.release.set()
+        log.close()
+        return log, stream.getvalue().split()
+
+    def test_drop_newest_keeps_the_oldest(self):
+        log, lines = self.fill_while_blocked("drop_newest")
+        self.assertEqual(lines, ["first", "a", "a", "a", "a"])
+        self.assertEqual(log.stats()["dropped_by_kind"], {"a": 2, "b": 2})
+
+    def test_drop_oldest_keeps_the_newest(self):
+        log, lines = self.fill_while_blocked("drop_oldest")
+        self.assertEqual(lines, ["first", "a", "a", "b", "b"])
+        stats = log.stats()
+        self.assertEqual(stats["dropped"], 4)
+        self.assertEqual(stats["dropped_by_kind"], {"a": 4})
+        self.assertEqual(stats["logged"], 9)
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            EventLog(stream=io.StringIO(), policy="block")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing glyphs
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame  # noqa: E402
+
+from glyphs import GlyphCache  # noqa: E402
+
+BLACK = (0, 0, 0)
+
+
+class TestGlyphCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.font.init()
+        cls.font = pygame.font.SysFont(None, 36)
+
+    def test_hit_returns_same_surface_and_mask(self):
+        cache = GlyphCache()
+        first = cache.get(17, self.font, BLACK)
+        second = cache.get(17, self.font, BLACK)
+        self.assertIs(first[0], second[0])
+        self.assertIs(first[1], second[1])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_color_is_part_of_key(self):
+        cache = GlyphCache()
+        cache.get(17, self.font, BLACK)
+        cache.get(17, self.font, (255, 0, 0))
+        self.assertEqual(cache.misses, 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = GlyphCache(max_size=2)
+        cache.get(1, self.font, BLACK)
+        cache.get(2, self.font, BLACK)
+        cache.get(1, self.font, BLACK)  # 2 is now the oldest
+        cache.get(3, self.font, BLACK)
+        self.assertEqual(cache.evictions, 1)
+        self.assertNotIn((2, self.font, BLACK), cache.entries)
+        self.assertIn((1, self.font, BLACK), cache.entries)
+
+    def test_warm_fills_without_counting(self):
+        cache = GlyphCache()
+        cache.warm(range(10, 100), self.font, BLACK)
+        self.assertEqual(cache.stats()["size"], 90)
+        cache.get(50, self.font, BLACK)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing lanes
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame  # noqa: E402
+
+from lanes import LaneIndex  # noqa: E402
+
+TOP, BOTTOM = 100, 200
+
+
+class Box(pygame.sprite.Sprite):
+    def __init__(self, x, lane, width=20):
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, width, 20)
+        self.rect.x = x
+        self.rect.centery = lane
+
+
+class TestLaneIndex(unittest.TestCase):
+    def test_keeps_lane_ordered_by_right_edge(self):
+        index = LaneIndex([TOP, BOTTOM])
+        for x in (300, 500, 400):
+            index.add(Box(x, TOP))
+        self.assertEqual([s.rect.x for s in index.lanes[TOP]], [300, 400, 500])
+
+    def test_candidates_only_near_rect(self):
+        index = LaneIndex([TOP, BOTTOM])
+        near_top = Box(95, TOP)
+        near_bottom = Box(110, BOTTOM)
+        for sprite in (near_top, near_bottom, Box(300, TOP), Box(0, TOP, width=5)):
+            index.add(sprite)
+        player = pygame.Rect(100, 90, 40, 20)
+        self.assertEqual(index.candidates(player), [near_top])
+
+    def test_pop_offscreen_takes_from_front(self):
+        index = LaneIndex([TOP, BOTTOM])
+        gone = Box(-30, TOP)
+        index.add(gone)
+        index.add(Box(50, TOP))
+        index.add(Box(-40, BOTTOM))
+        self.assertEqual(len(index.pop_offscreen()), 2)
+        self.assertEqual(len(index), 1)
+        self.assertNotIn(gone, list(index))
+
+    def test_discard(self):
+        index = LaneIndex([TOP, BOTTOM])
+        first, second = Box(10, TOP), Box(60, TOP)
+        index.add(first)
+        index.add(second)
+        index.discard(second)
+        index.discard(second)  # Already gone, ignored
+        self.assertEqual(list(index), [first])
+
+
+if __name__ == "__main__":
+    unittest.main()
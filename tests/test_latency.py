@@ -0,0 +1,49 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing latency
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from latency import LatencyTracer  # noqa: E402
+
+
+class TestLatencyTracer(unittest.TestCase):
+    def test_measures_from_receipt_to_flip(self):
+        tracer = LatencyTracer()
+        tracer.key_received(at=1.000)
+        tracer.key_received(at=1.004)
+        tracer.frame_presented(at=1.010)  # Not applied by a tick yet
+        self.assertEqual(tracer.traced, 0)
+        tracer.inputs_applied()
+        tracer.key_received(at=1.012)  # Arrived after the tick
+        tracer.frame_presented(at=1.020)
+        self.assertEqual(tracer.traced, 2)
+        self.assertEqual(sorted(round(s * 1000) for s in tracer.samples), [16, 20])
+        self.assertEqual(tracer.received, [1.012])
+
+    def test_summary_in_milliseconds(self):
+        tracer = LatencyTracer()
+        for i in range(100):
+            tracer.key_received(at=0.0)
+            tracer.inputs_applied()
+            tracer.frame_presented(at=(i + 1) / 1000)
+        stats = tracer.summary()
+        self.assertAlmostEqual(stats["p50"], 51)
+        self.assertAlmostEqual(stats["p99"], 100)
+        self.assertAlmostEqual(stats["max"], 100)
+        self.assertAlmostEqual(stats["mean"], 50.5)
+        self.assertEqual(LatencyTracer().summary()["p95"], 0.0)
+
+    def test_discard_drops_pending_keys(self):
+        tracer = LatencyTracer()
+        tracer.key_received(at=0.0)
+        tracer.inputs_applied()
+        tracer.key_received(at=0.1)
+        tracer.discard()
+        tracer.frame_presented(at=0.2)
+        self.assertEqual((tracer.traced, tracer.discarded), (0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing pool
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import engine  # noqa: E402
+from pool import SpritePool  # noqa: E402
+
+
+class Thing:
+    def __init__(self, value):
+        self.value = value
+
+    def reinit(self, value):
+        self.value = value
+
+
+class TestSpritePool(unittest.TestCase):
+    def test_reuses_released_objects(self):
+        pool = SpritePool(Thing)
+        first = pool.acquire(1)
+        pool.release(first)
+        second = pool.acquire(2)
+        self.assertIs(first, second)
+        self.assertEqual(second.value, 2)
+        self.assertEqual((pool.created, pool.reused), (1, 1))
+
+    def test_free_list_is_bounded(self):
+        pool = SpritePool(Thing, max_free=1)
+        pool.release(Thing(1))
+        pool.release(Thing(2))
+        self.assertEqual(pool.discarded, 1)
+        self.assertEqual(len(pool.free), 1)
+
+    def test_engine_recycles_number_sprites(self):
+        game = engine.Engine(seed=4)
+        spawned = 0
+        for _ in range(3):
+            while game.running and game.tick < 3000:
+                game.step([engine.JUMP] if game.tick % 45 == 0 else [])
+            spawned += game.spawn_count
+            game.reset()
+        pool = game.number_pool
+        self.assertGreater(pool.reused, 0)
+        self.assertLess(pool.created, spawned)
+
+
+if __name__ == "__main__":
+    unittest.main()
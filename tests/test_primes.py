@@ -0,0 +1,84 @@
+import random
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing primes
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from primes import DensitySampler, PrimeOracle, miller_rabin  # noqa: E402
+
+
+def trial_division(num):
+    if num < 2:
+        return False
+    for i in range(2, int(num**0.5) + 1):
+        if num % i == 0:
+            return False
+    return True
+
+
+class TestPrimeOracle(unittest.TestCase):
+    def test_matches_trial_division_across_growth(self):
+        oracle = PrimeOracle(limit=50)
+        for limit in (50, 99, 129, 500, 2000):
+            oracle.ensure(limit)
+            for n in range(-5, 2500):
+                with self.subTest(limit=limit, n=n):
+                    self.assertEqual(oracle.is_prime(n), trial_division(n))
+
+    def test_sieve_grows_to_cover_limit(self):
+        oracle = PrimeOracle(limit=99)
+        oracle.ensure(129)
+        self.assertGreaterEqual(oracle.limit, 129)
+        before = oracle.sieve_lookups
+        oracle.is_prime(127)
+        self.assertEqual(oracle.sieve_lookups, before + 1)
+
+    def test_miller_rabin_large_values(self):
+        self.assertTrue(miller_rabin(2_147_483_647))  # Mersenne prime 2^31 - 1
+        self.assertTrue(miller_rabin(1_000_000_007))
+        self.assertFalse(miller_rabin(3_215_031_751))  # Strong pseudoprime to 2,3,5,7
+        self.assertFalse(miller_rabin(1_000_000_007 * 998_244_353))
+
+
+class TestDensitySampler(unittest.TestCase):
+    def test_hits_the_target_ratio(self):
+        sampler = DensitySampler(10, 500, 0.4)
+        rng = random.Random(0)
+        draws = [sampler.draw(rng) for _ in range(20000)]
+        self.assertTrue(all(10 <= n <= 500 for n in draws))
+        share = sum(map(trial_division, draws)) / len(draws)
+        self.assertAlmostEqual(share, 0.4, delta=0.02)
+
+    def test_extend_matches_a_fresh_build(self):
+        sampler = DensitySampler(10, 99, 0.5, skip_easy_composites=True)
+        for high in (129, 159, 500):
+            sampler.extend(high)
+            fresh = DensitySampler(10, high, 0.5, skip_easy_composites=True)
+            self.assertEqual(sampler.primes, fresh.primes)
+            self.assertEqual(sampler.composites, fresh.composites)
+        sampler.truncate(99)
+        self.assertEqual(sampler.primes, DensitySampler(10, 99, 0.5).primes)
+
+    def test_skips_easy_composites(self):
+        sampler = DensitySampler(10, 200, 0.0, skip_easy_composites=True)
+        rng = random.Random(1)
+        for n in (sampler.draw(rng) for _ in range(2000)):
+            self.assertFalse(trial_division(n))
+            self.assertTrue(n % 2 and n % 5)
+
+    def test_redraw_replays_an_older_range(self):
+        sampler = DensitySampler(10, 99, 0.3)
+        rng = random.Random(2)
+        state = rng.getstate()
+        sampler.draw(rng)
+        after = rng.random()
+        sampler.extend(500)
+        rng.setstate(state)
+        sampler.redraw(rng, 99)
+        self.assertEqual(rng.random(), after)
+
+
+if __name__ == "__main__":
+    unittest.main()
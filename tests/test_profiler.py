@@ -0,0 +1,59 @@
+import csv
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the parent directory to the Python path to allow importing profiler
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame  # noqa: E402
+
+import engine  # noqa: E402
+from profiler import PHASES, FrameProfiler, percentile  # noqa: E402
+
+
+class TestFrameProfiler(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(100))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_engine_laps_its_phases(self):
+        profiler = FrameProfiler()
+        game = engine.Engine(seed=1)
+        game.profiler = profiler
+        for _ in range(120):
+            profiler.begin_frame()
+            game.step()
+            profiler.end_frame()
+        self.assertEqual(profiler.frames, 120)
+        self.assertGreater(sum(profiler.windows["update"]), 0)
+        self.assertEqual(set(profiler.summary()), set(PHASES) | {"frame"})
+
+    def test_export_csv(self):
+        profiler = FrameProfiler()
+        for _ in range(3):
+            profiler.begin_frame()
+            profiler.lap("draw")
+            profiler.end_frame()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.csv")
+            profiler.export_csv(path)
+            with open(path, newline="") as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows[0][:3], ["frame", "frame_ns", "events_ns"])
+        self.assertEqual(len(rows), 4)
+
+    def test_overlay_is_cached_between_refreshes(self):
+        pygame.font.init()
+        font = pygame.font.SysFont(None, 20)
+        profiler = FrameProfiler()
+        profiler.toggle_overlay()
+        first = profiler.overlay_surface(font)
+        self.assertIs(profiler.overlay_surface(font), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
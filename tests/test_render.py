@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing render
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+try:
+    import numpy  # noqa: F401 - only needed by the array-backed numbers
+except ImportError:
+    numpy = None
+
+import engine  # noqa: E402
+from render import DirtyRectRenderer, FullRenderer  # noqa: E402
+from settings import SCREEN_HEIGHT, SCREEN_WIDTH  # noqa: E402
+
+
+class TestDirtyRectRenderer(unittest.TestCase):
+    def setUp(self):
+        pygame.display.init()
+        pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.font.init()
+        self.font = pygame.font.SysFont(None, 36)
+
+    def tearDown(self):
+        pygame.display.quit()
+
+    def test_matches_full_redraw(self):
+        size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        full = FullRenderer(pygame.Surface(size))
+        dirty = DirtyRectRenderer(pygame.Surface(size))
+        game = engine.Engine(seed=5, font=self.font)
+        labels = {}
+        for _ in range(600):
+            if not game.running:
+                game.reset()
+                dirty.invalidate()
+            game.step([engine.JUMP] if game.tick % 50 == 0 else [])
+            score = labels.setdefault(
+                game.score, self.font.render(f"Score: {game.score}", True, (0, 0, 0))
+            )
+            hud = [(score, (10, 10))]
+            full.draw(game.all_sprites, hud)
+            dirty.draw(game.all_sprites, hud)
+            self.assertEqual(
+                pygame.image.tobytes(full.screen, "RGB"),
+                pygame.image.tobytes(dirty.screen, "RGB"),
+                f"frames differ at tick {game.tick}",
+            )
+        self.assertLess(dirty.average_pixels_pushed(), full.average_pixels_pushed())
+
+    def test_hidden_hud_entry_is_cleared(self):
+        # E.g. the profiler overlay toggled off with F3
+        size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        full = FullRenderer(pygame.Surface(size))
+        dirty = DirtyRectRenderer(pygame.Surface(size))
+        game = engine.Engine(seed=5, font=self.font)
+        score = self.font.render("Score: 0", True, (0, 0, 0))
+        overlay = pygame.Surface((200, 120))
+        overlay.fill((85, 85, 85))
+        for frame in range(90):
+            game.step([])
+            hud = [(score, (10, 10))]
+            if 30 <= frame < 60:
+                hud.append((overlay, (SCREEN_WIDTH - 210, 10)))
+            full.draw(game.all_sprites, hud)
+            dirty.draw(game.all_sprites, hud)
+            self.assertEqual(
+                pygame.image.tobytes(full.screen, "RGB"),
+                pygame.image.tobytes(dirty.screen, "RGB"),
+                f"frames differ at frame {frame}",
+            )
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_batch_matches_full_redraw(self):
+        size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        full = FullRenderer(pygame.Surface(size))
+        dirty = DirtyRectRenderer(pygame.Surface(size))
+        game = engine.Engine(seed=5, font=self.font, frenzy=True)
+        hud = [(self.font.render("Score: 0", True, (0, 0, 0)), (10, 10))]
+        most_numbers = 0
+        for _ in range(300):
+            if not game.running:
+                game.reset()
+                dirty.invalidate()
+            game.step([engine.JUMP] if game.tick % 50 == 0 else [])
+            batch = game.number_store.blit_sequence()
+            most_numbers = max(most_numbers, len(batch))
+            full.draw(game.all_sprites, hud, batch=batch)
+            dirty.draw(game.all_sprites, hud, batch=batch)
+            self.assertEqual(
+                pygame.image.tobytes(full.screen, "RGB"),
+                pygame.image.tobytes(dirty.screen, "RGB"),
+                f"frames differ at tick {game.tick}",
+            )
+        self.assertGreater(most_numbers, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import sys
+import os
+import io
+import tempfile
+from contextlib import redirect_stdout
+from unittest import mock
+
+# Add the parent directory to the Python path to allow importing replay
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import engine  # noqa: E402
+import replay  # noqa: E402
+from settings import NUMBER_LEVEL_TOP_Y  # noqa: E402
+
+
+def jump_policy(game):
+    # Jump for top-lane primes and over bottom-lane composites
+    player = game.player.rect
+    for sprite in game.numbers_group:
+        if 0 <= sprite.rect.left - player.right <= 40:
+            top = sprite.rect.centery == NUMBER_LEVEL_TOP_Y
+            if top == sprite.is_prime_val:
+                return [engine.JUMP]
+    return []
+
+
+def record_game(seed, max_ticks=20000):
+    game = engine.Engine(seed=seed)
+    recorder = replay.Recorder(game)
+    while game.running and game.tick < max_ticks:
+        actions = jump_policy(game)
+        recorder.record(game.tick + 1, actions, game.step(actions))
+    return game, recorder
+
+
+class TestReplay(unittest.TestCase):
+    def test_replay_reproduces_recorded_game(self):
+        game, recorder = record_game(seed=5)
+        recording = replay.parse(recorder.to_bytes(game))
+        self.assertEqual(recording.seed, 5)
+        self.assertEqual(recording.score, game.score)
+        self.assertTrue(recording.game_over or recording.game_won)
+        self.assertEqual(len(recording.spawns), game.spawn_count)
+
+        result = replay.replay(recording, engine.Engine())
+        self.assertTrue(result.ok, result.error)
+        self.assertEqual(result.ticks, game.tick)
+        self.assertEqual(result.score, game.score)
+
+    def test_log_is_a_few_bytes_per_event(self):
+        game, recorder = record_game(seed=2)
+        data = recorder.to_bytes(game)
+        self.assertEqual(
+            len(data),
+            replay.HEADER.size
+            + recorder.input_count * replay.INPUT.size
+            + recorder.spawn_count * replay.SPAWN.size,
+        )
+
+    def test_mid_game_recording_stops_at_recorded_tick(self):
+        game, recorder = record_game(seed=9, max_ticks=900)
+        self.assertTrue(game.running)
+        result = replay.replay(replay.parse(recorder.to_bytes(game)), engine.Engine())
+        self.assertTrue(result.ok, result.error)
+        self.assertEqual(result.ticks, 900)
+
+    def test_divergence_is_reported(self):
+        game, recorder = record_game(seed=5)
+        recording = replay.parse(recorder.to_bytes(game))
+        # Without the key presses the run no longer plays out the same way
+        tampered = recording._replace(inputs=[])
+        result = replay.replay(tampered, engine.Engine())
+        self.assertFalse(result.ok)
+        self.assertIsNotNone(result.error)
+
+    def test_different_sprites_are_rejected(self):
+        game, recorder = record_game(seed=5, max_ticks=60)
+        recording = replay.parse(recorder.to_bytes(game))
+        other = engine.Engine(player_image=engine.pygame.Surface((10, 10)))
+        result = replay.replay(recording, other)
+        self.assertFalse(result.ok)
+        self.assertIn("sprites", result.error)
+
+    def test_damaged_recordings_are_rejected(self):
+        game, recorder = record_game(seed=5, max_ticks=600)
+        data = recorder.to_bytes(game)
+        self.assertGreater(recorder.input_count, 0)
+        bad_action = bytearray(data)
+        bad_action[replay.HEADER.size + 4] = 99  # First input's action code
+        damaged = {
+            "short": data[:30],
+            "truncated": data[:-1],
+            "trailing bytes": data + b"x",
+            "bad action": bytes(bad_action),
+        }
+        for name, contents in damaged.items():
+            with self.subTest(damage=name):
+                with self.assertRaises(ValueError):
+                    replay.parse(contents)
+
+    def test_corpus_run_counts_unreadable_files_as_failures(self):
+        game, recorder = record_game(seed=5, max_ticks=300)
+        with tempfile.TemporaryDirectory() as directory:
+            good = os.path.join(directory, "good" + replay.FILE_SUFFIX)
+            bad = os.path.join(directory, "bad" + replay.FILE_SUFFIX)
+            with open(good, "wb") as f:
+                f.write(recorder.to_bytes(game))
+            with open(bad, "wb") as f:
+                f.write(b"\0" * 30)
+            output = io.StringIO()
+            with mock.patch.object(replay, "make_engine", engine.Engine):
+                with redirect_stdout(output):
+                    failures = replay.replay_paths([bad, directory])
+        self.assertEqual(failures, 2)  # bad, twice
+        lines = output.getvalue().splitlines()
+        self.assertEqual(
+            [line.split()[0] for line in lines[:3]], ["FAIL", "FAIL", "ok"]
+        )
+        self.assertIn("2 failure(s)", lines[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import random
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing snapshot
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import balance  # noqa: E402
+import engine  # noqa: E402
+import snapshot  # noqa: E402
+
+try:
+    import numpy  # noqa: F401
+except ImportError:  # NumPy is optional
+    numpy = None
+
+
+def play_with_checkpoints(game, max_ticks=3000, every=150):
+    # Plays a scripted game, keeping a checkpoint every few ticks. Returns the
+    # inputs of every tick, the checkpoints and the final state.
+    policy_rng = random.Random(1)
+    inputs = []
+    checkpoints = []
+    while game.running and game.tick < max_ticks:
+        actions = list(balance.lookahead_flip_policy(game, policy_rng))
+        inputs.append(actions)
+        game.step(actions)
+        if game.tick % every == 0:
+            checkpoints.append(snapshot.capture(game))
+    return inputs, checkpoints, snapshot.capture(game).fingerprint(game.spawner)
+
+
+class TestSnapshots(unittest.TestCase):
+    def assert_checkpoints_replay(self, game):
+        inputs, checkpoints, final = play_with_checkpoints(game)
+        self.assertGreater(len(checkpoints), 2)
+        for checkpoint in checkpoints:
+            with self.subTest(tick=checkpoint.tick):
+                snapshot.restore(game, checkpoint)
+                self.assertEqual(
+                    snapshot.capture(game).fingerprint(game.spawner),
+                    checkpoint.fingerprint(game.spawner),
+                )
+                for actions in inputs[checkpoint.tick :]:
+                    game.step(actions)
+                self.assertEqual(
+                    snapshot.capture(game).fingerprint(game.spawner), final
+                )
+
+    def test_checkpoints_replay_to_the_same_state(self):
+        self.assert_checkpoints_replay(engine.Engine(seed=7))
+
+    def test_checkpoints_with_planned_spawns_and_a_prime_ratio(self):
+        rules = engine.DEFAULT_RULES._replace(prime_ratio=0.5, powerup_spawn_chance=0.3)
+        game = engine.Engine(seed=7, rules=rules)
+        game.spawner.start()
+        try:
+            self.assert_checkpoints_replay(game)
+        finally:
+            game.spawner.stop()
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_checkpoints_with_the_array_store(self):
+        self.assert_checkpoints_replay(engine.Engine(seed=7, entity_store="arrays"))
+
+    def test_ring_rewinds_and_forgets_the_future(self):
+        game = engine.Engine(seed=3)
+        ring = snapshot.SnapshotRing(capacity=50)
+        for _ in range(80):
+            game.step([engine.JUMP] if game.tick % 30 == 0 else [])
+            ring.record(game)
+        self.assertEqual(len(ring), 50)
+        state = ring.rewind(game, 10)
+        self.assertEqual((state.tick, game.tick), (70, 70))
+        self.assertEqual(len(ring), 40)
+        ring.rewind(game, 1000)  # Clamped to the oldest snapshot kept
+        self.assertEqual(game.tick, 31)
+        game.step()
+        ring.record(game)
+        self.assertEqual(ring.rewind(game, 1).tick, 31)
+
+    def test_restore_reuses_pooled_sprites(self):
+        game = engine.Engine(seed=3)
+        for _ in range(400):
+            game.step()
+        state = snapshot.capture(game)
+        created = game.number_pool.created
+        for _ in range(10):
+            snapshot.restore(game, state)
+        self.assertEqual(game.number_pool.created, created)
+        self.assertEqual(
+            len(game.all_sprites), 1 + len(state.numbers) + len(state.powerups)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import subprocess
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Add the parent directory to the Python path to allow importing soak
+sys.path.append(ROOT)
+
+from soak import MIN_SAMPLES, SoakMonitor, find_growth  # noqa: E402
+
+
+def fake_game(sprites):
+    pool = SimpleNamespace(created=len(sprites))
+    engine = SimpleNamespace(
+        all_sprites=sprites,
+        numbers_group=sprites,
+        powerups_group=[],
+        number_store=None,
+        number_pool=pool,
+        powerup_pool=pool,
+    )
+    return SimpleNamespace(engine=engine, games_played=0)
+
+
+class TestFindGrowth(unittest.TestCase):
+    def test_steady_climb_is_growth(self):
+        values = list(range(0, 400, 10))
+        early_peak, late_floor = find_growth(values, slack=5)
+        self.assertLess(early_peak, late_floor)
+
+    def test_sawtooth_is_bounded(self):
+        # Drops back on every restart, however high each game climbs
+        values = [i % 7 * 100 for i in range(40)]
+        self.assertIsNone(find_growth(values, slack=5))
+
+    def test_rise_within_slack_is_bounded(self):
+        values = [1000 + i for i in range(40)]
+        self.assertIsNone(find_growth(values, slack=100))
+        self.assertIsNotNone(find_growth(values, slack=10))
+
+    def test_needs_enough_samples(self):
+        self.assertIsNone(find_growth(list(range(0, 1000, 100))[:MIN_SAMPLES], 0))
+        self.assertIsNone(find_growth([None] * 40, 0))
+
+
+class TestSoakMonitor(unittest.TestCase):
+    def test_samples_and_flags_a_leaking_group(self):
+        monitor = SoakMonitor(interval=1, trace=False)
+        sprites = []
+        for i in range(40):
+            monitor.frame(0.002)
+            monitor.frame(0.004)
+            sprites.extend(object() for _ in range(10))  # Never released
+            monitor.sample(fake_game(list(sprites)), now=monitor.started_at + i)
+        self.assertFalse(monitor.due(monitor.started_at + 39.5))
+        self.assertTrue(monitor.due(monitor.started_at + 40))
+        record = monitor.samples[-1]
+        self.assertEqual(record["all_sprites"], 400)
+        self.assertEqual(record["frames"], 2)
+        self.assertAlmostEqual(record["frame_max_ms"], 4.0)
+        growth = monitor.growth()
+        self.assertIn("all_sprites", growth)
+        self.assertIn("pooled_sprites", growth)
+        self.assertNotIn("frame_p99_ms", growth)
+        self.assertTrue(monitor.report()[-1].startswith("GROWING"))
+
+
+class TestSoakRun(unittest.TestCase):
+    def test_short_soak_passes(self):
+        # The real game under the dummy SDL drivers for a few seconds
+        result = subprocess.run(
+            [
+                sys.executable,
+                "soak.py",
+                "--duration",
+                "3",
+                "--interval",
+                "0.25",
+                "--",
+                "--event-log",
+                os.devnull,
+            ],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn("No unbounded growth", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing spawner
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import engine  # noqa: E402
+from spawner import NUMBER, POWERUP  # noqa: E402
+
+
+def play(seed, background, max_ticks=6000, rules=engine.DEFAULT_RULES):
+    game = engine.Engine(seed=seed, rules=rules)
+    if background:
+        game.spawner.start()
+    events = []
+    while game.running and game.tick < max_ticks:
+        actions = [engine.JUMP] if game.tick % 40 == 0 else []
+        if game.has_gravity_flip_charge and game.tick % 97 == 0:
+            actions.append(engine.FLIP)
+        events.extend(game.step(actions))
+    game.spawner.stop()
+    return game.tick, game.score, events
+
+
+class TestSpawnScheduler(unittest.TestCase):
+    def test_background_refill_plays_the_same_game(self):
+        for seed in (1, 4):
+            with self.subTest(seed=seed):
+                self.assertEqual(play(seed, False), play(seed, True))
+
+    def test_background_refill_with_a_prime_ratio(self):
+        rules = engine.DEFAULT_RULES._replace(prime_ratio=0.6)
+        self.assertEqual(play(2, False, rules=rules), play(2, True, rules=rules))
+
+    def test_invalidate_rewinds_the_rng(self):
+        game = engine.Engine(seed=3)
+        spawner = game.spawner
+        spawner.fill()
+        planned = [(plan.kind, plan.value, plan.x) for plan in spawner.buffer]
+        spawner.invalidate()
+        self.assertEqual(len(spawner.buffer), 0)
+        spawner.fill()
+        self.assertEqual(
+            [(plan.kind, plan.value, plan.x) for plan in spawner.buffer], planned
+        )
+
+    def test_plans_follow_a_widened_range(self):
+        game = engine.Engine(seed=3)
+        game.spawner.fill()
+        self.assertLessEqual(
+            max(plan.value or 0 for plan in game.spawner.buffer),
+            engine.INITIAL_MAX_NUMBER,
+        )
+        game.score = 200  # Enough for one difficulty step
+        game.update_difficulty()
+        game.spawner.fill()
+        self.assertEqual(game.spawner.invalidations, 2)  # reset() and the step
+        values = [plan.value for plan in game.spawner.buffer if plan.kind == NUMBER]
+        self.assertLessEqual(max(values), game.current_max_number_limit)
+        self.assertGreater(max(values), engine.INITIAL_MAX_NUMBER)
+
+    def test_holding_a_charge_turns_powerups_into_numbers(self):
+        game = engine.Engine(
+            seed=0, rules=engine.DEFAULT_RULES._replace(powerup_spawn_chance=0.5)
+        )
+        spawner = game.spawner
+        spawner.fill()
+        self.assertIn(POWERUP, [plan.kind for plan in spawner.buffer])
+        kinds = [spawner.pop(holding_charge=True).kind for _ in range(30)]
+        self.assertEqual(set(kinds), {NUMBER})
+
+    def test_stop_joins_the_worker(self):
+        game = engine.Engine(seed=0)
+        game.spawner.start()
+        game.spawner.stop()
+        self.assertIsNone(game.spawner.worker)
+        self.assertLessEqual(len(game.spawner.buffer), game.spawner.capacity)
+
+
+if __name__ == "__main__":
+    unittest.main()
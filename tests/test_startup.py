@@ -0,0 +1,61 @@
+import subprocess
+import unittest
+import sys
+import os
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_main_has_no_side_effects(self):
+        # Importing main must not pull in pygame, open a window or start the loop
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, main; print('pygame' in sys.modules, main.IMPORT_SECONDS)",
+            ],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        pygame_loaded, import_seconds = result.stdout.split()
+        self.assertEqual(pygame_loaded, "False")
+        self.assertLess(float(import_seconds), 1.0)
+
+    def test_run_freezes_the_loaded_resources(self):
+        # The lazy resources must exist by the time run() freezes the heap
+        script = """
+import gc, sys
+from main import parse_args
+from game import Game
+
+class OneFrame(Game):
+    def run_frame(self):
+        tracked = {id(o) for o in gc.get_objects()}
+        print(gc.get_freeze_count() > 0, id(self.engine) in tracked,
+              id(self.engine.number_pool) in tracked, id(self.screen) in tracked)
+        self.running = False
+
+OneFrame(parse_args(["--event-log", sys.argv[1]])).run()
+"""
+        env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+        result = subprocess.run(
+            [sys.executable, "-c", script, os.devnull],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            timeout=60,
+            env=env,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        line = next(
+            line for line in result.stdout.splitlines() if line.startswith(("T", "F"))
+        )
+        self.assertEqual(line.split(), ["True", "False", "False", "False"])
+
+
+if __name__ == "__main__":
+    unittest.main()
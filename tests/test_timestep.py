@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing timestep
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import io  # noqa: E402
+
+import engine  # noqa: E402
+from event_log import EventLog  # noqa: E402
+from game import Game  # noqa: E402
+from main import parse_args  # noqa: E402
+from timestep import FixedStepClock, interpolate_positions  # noqa: E402
+
+
+def simulate(display_hz, ticks=1200):
+    # Drive the engine from a display running at display_hz until it has
+    # seen the given number of ticks
+    game = engine.Engine(seed=11)
+    clock = FixedStepClock()
+    frame_ms = 1000 / display_hz
+    while game.tick < ticks and game.running:
+        for _ in range(clock.advance(frame_ms)):
+            if game.tick < ticks:
+                game.step([engine.JUMP] if game.tick % 40 == 0 else [])
+    return game
+
+
+class TestFixedStepClock(unittest.TestCase):
+    def test_accumulates_partial_steps(self):
+        clock = FixedStepClock(step_ms=10)
+        self.assertEqual(clock.advance(4), 0)
+        self.assertAlmostEqual(clock.alpha, 0.4)
+        self.assertEqual(clock.advance(7), 1)
+        self.assertAlmostEqual(clock.alpha, 0.1)
+
+    def test_drops_steps_beyond_catch_up_limit(self):
+        clock = FixedStepClock(step_ms=10, max_steps_per_frame=3)
+        self.assertEqual(clock.advance(100), 3)
+        self.assertEqual(clock.dropped_steps, 7)
+        self.assertEqual(clock.catch_up_frames, 1)
+
+    def test_borrowed_step_is_paid_back(self):
+        clock = FixedStepClock(step_ms=10)
+        clock.advance(4)
+        clock.borrow_step()
+        self.assertEqual(clock.alpha, 0.0)
+        self.assertEqual(clock.advance(10), 0)  # Still paying back
+        self.assertEqual(clock.advance(10), 1)
+        self.assertEqual(clock.steps, 2)
+        self.assertAlmostEqual(clock.alpha, 0.4)
+
+    def test_physics_identical_at_any_display_rate(self):
+        reference = simulate(60)
+        for display_hz in (30, 120, 144):
+            with self.subTest(display_hz=display_hz):
+                game = simulate(display_hz)
+                self.assertEqual(game.tick, reference.tick)
+                self.assertEqual(game.player.y_float, reference.player.y_float)
+                self.assertEqual(game.score, reference.score)
+                self.assertEqual(
+                    sorted(s.rect.topleft for s in game.all_sprites),
+                    sorted(s.rect.topleft for s in reference.all_sprites),
+                )
+
+
+class TestInterpolation(unittest.TestCase):
+    def test_gravity_flip_is_drawn_at_the_new_position(self):
+        game = Game(parse_args(["--gc", "auto"]))
+        self.addCleanup(game.gc_policy.close)
+        # The engine and a silent event log and sound table, without a window
+        game.__dict__["engine"] = engine.Engine(seed=3)
+        game.__dict__["sounds"] = {"powerup_collect": None}
+        game.__dict__["event_log"] = EventLog(stream=io.StringIO())
+        self.addCleanup(game.event_log.close)
+        player = game.engine.player
+        game.engine.has_gravity_flip_charge = True
+        game.previous_positions = {
+            sprite: sprite.rect.topleft for sprite in game.engine.all_sprites
+        }
+        before = player.rect.topleft
+        for event in game.engine.step([engine.FLIP]):
+            game.handle_engine_event(event)
+        self.assertNotEqual(player.rect.top, before[1])
+        positions = interpolate_positions(
+            game.previous_positions, game.engine.all_sprites, 0.5
+        )
+        self.assertEqual(
+            positions.get(player, player.rect.topleft), player.rect.topleft
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
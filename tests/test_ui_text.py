@@ -0,0 +1,41 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing ui_text
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame  # noqa: E402
+
+from ui_text import UiText  # noqa: E402
+
+BLACK = (0, 0, 0)
+
+
+class TestUiText(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.font.init()
+        cls.font = pygame.font.SysFont(None, 36)
+
+    def test_label_only_renders_on_change(self):
+        ui = UiText()
+        label = ui.label(self.font, BLACK, "Score: {}")
+        first = label.render(0)
+        self.assertIs(label.render(0), first)
+        self.assertFalse(label.changed)
+        label.render(17)
+        self.assertTrue(label.changed)
+        self.assertEqual(ui.renders, 2)
+        self.assertEqual(ui.skipped_renders, 1)
+
+    def test_static_text_rendered_once(self):
+        ui = UiText()
+        first = ui.static("GAME OVER", self.font, BLACK)
+        self.assertIs(ui.static("GAME OVER", self.font, BLACK), first)
+        self.assertEqual(ui.stats()["renders"], 1)
+        self.assertEqual(ui.stats()["skipped_renders"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
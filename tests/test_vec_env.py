@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to allow importing vec_env
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import engine  # noqa: E402
+
+try:
+    import numpy as np  # noqa: E402
+
+    import vec_env  # noqa: E402
+except ImportError:  # NumPy is optional
+    vec_env = None
+
+
+def scripted_actions(tick, num_envs):
+    # Env i jumps every 40 + i ticks and tries to flip every 97
+    return [
+        (vec_env.JUMP_BIT if tick % (40 + i) == 0 else 0)
+        | (vec_env.FLIP_BIT if tick % 97 == 0 else 0)
+        for i in range(num_envs)
+    ]
+
+
+@unittest.skipIf(vec_env is None, "NumPy is not installed")
+class TestVecEnv(unittest.TestCase):
+    def test_shapes(self):
+        env = vec_env.VecEnv(4)
+        observations = env.reset()
+        self.assertEqual(observations.shape, (4, env.observation_size))
+        self.assertEqual(env.observation_size, 4 + 2 * 3 * 3 + 2 * 2)
+        observations, rewards, dones, info = env.step([0, 1, 2, 3])
+        self.assertEqual(observations.dtype, np.float32)
+        self.assertEqual((rewards.shape, dones.shape), ((4,), (4,)))
+        self.assertEqual(info["scores"].shape, (4,))
+
+    def test_rewards_follow_the_engine(self):
+        # Every env plays the same game a lone Engine with its seed would
+        env = vec_env.VecEnv(3, seed=10, max_ticks=10**9)
+        env.reset()
+        games = [engine.Engine(seed=10 + i) for i in range(3)]
+        finished = [None] * 3
+        for tick in range(1, 1500):
+            actions = scripted_actions(tick, 3)
+            _, rewards, dones, info = env.step(actions)
+            for i, game in enumerate(games):
+                if finished[i] is not None:
+                    continue
+                score = game.score
+                game.step(vec_env.ACTIONS[actions[i]])
+                expected = game.score - score
+                if game.game_over:
+                    expected += vec_env.DEATH_REWARD
+                self.assertEqual(rewards[i], expected)
+                self.assertEqual(dones[i], not game.running)
+                if dones[i]:
+                    finished[i] = tick
+                    self.assertEqual(info["scores"][i], game.score)
+                    self.assertEqual(info["ticks"][i], game.tick)
+        self.assertTrue(any(finished))
+        self.assertGreaterEqual(env.next_seed, 13 + sum(map(bool, finished)))
+
+    def test_done_games_restart_and_truncate(self):
+        env = vec_env.VecEnv(2, max_ticks=50)
+        env.reset()
+        for _ in range(49):
+            _, _, dones, _ = env.step([0, 0])
+            self.assertFalse(dones.any())
+        _, _, dones, info = env.step([0, 0])
+        self.assertTrue(dones.all())
+        self.assertEqual(info["ticks"].tolist(), [50, 50])
+        self.assertEqual([game.tick for game in env.engines], [0, 0])
+
+    def test_array_store_observes_the_same(self):
+        sprites = vec_env.VecEnv(2, seed=4)
+        arrays = vec_env.VecEnv(2, seed=4, entity_store="arrays")
+        first, second = sprites.reset(), arrays.reset()
+        for tick in range(1, 800):
+            actions = scripted_actions(tick, 2)
+            first = sprites.step(actions)[0]
+            second = arrays.step(actions)[0]
+            np.testing.assert_array_equal(first, second)
+        self.assertTrue(first[:, 6].any())  # Some number slots were filled
+
+    def test_observes_nearest_numbers(self):
+        env = vec_env.VecEnv(1, seed=2)
+        env.reset()
+        for _ in range(300):
+            observations = env.step([0])[0]
+        game = env.engines[0]
+        row = observations[0]
+        self.assertEqual(row[2], game.player_gravity_direction)
+        lanes = game.number_lanes.lanes
+        for lane, lane_y in enumerate(env.lane_ys):
+            slots = row[4 + lane * 9 : 4 + (lane + 1) * 9].reshape(3, 3)
+            ahead = [n for n in lanes[lane_y] if n.rect.right >= game.player.rect.left]
+            self.assertEqual(int(slots[:, 2].sum()), min(3, len(ahead)))
+            for slot, number in zip(slots, ahead):
+                self.assertEqual(bool(slot[1]), number.is_prime_val)
+
+
+if __name__ == "__main__":
+    unittest.main()
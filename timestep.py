@@ -0,0 +1,66 @@
+# Fixed-timestep accumulator for driving the engine from a variable frame rate.
+#
+# The engine's physics constants are per tick, so it must always advance in
+# whole TICK_MS steps no matter how fast the display refreshes. Each frame
+# feeds the real elapsed time in; advance() says how many ticks to run and
+# alpha says how far between the last two ticks the frame should be drawn.
+# When the machine can't keep up the clock catches up by at most
+# max_steps_per_frame ticks and drops the rest, counting them.
+from settings import TICK_MS
+
+DEFAULT_MAX_STEPS_PER_FRAME = 5
+
+
+class FixedStepClock:
+    def __init__(
+        self, step_ms=TICK_MS, max_steps_per_frame=DEFAULT_MAX_STEPS_PER_FRAME
+    ):
+        self.step_ms = step_ms
+        self.max_steps_per_frame = max_steps_per_frame
+        self.accumulator = 0.0
+        self.steps = 0
+        self.dropped_steps = 0
+        self.catch_up_frames = 0  # Frames that had to run more than one step
+
+    def reset(self):
+        # Forget pending time, e.g. after a pause on the game over screen
+        self.accumulator = 0.0
+
+    def advance(self, elapsed_ms):
+        self.accumulator += elapsed_ms
+        steps = max(int(self.accumulator // self.step_ms), 0)
+        self.accumulator -= steps * self.step_ms
+        if steps > self.max_steps_per_frame:
+            self.dropped_steps += steps - self.max_steps_per_frame
+            steps = self.max_steps_per_frame
+        if steps > 1:
+            self.catch_up_frames += 1
+        self.steps += steps
+        return steps
+
+    def borrow_step(self):
+        # Runs one step ahead of time (e.g. to apply input at once); the next
+        # advance() pays it back, so the average rate stays the same
+        self.accumulator -= self.step_ms
+        self.steps += 1
+
+    @property
+    def alpha(self):
+        # Fraction of a step left in the accumulator, for render interpolation
+        return max(self.accumulator, 0.0) / self.step_ms
+
+
+def interpolate_positions(previous_positions, sprites, alpha):
+    # Where to draw each sprite: alpha of the way from its position before the
+    # last tick to its current one. New sprites are drawn where they are.
+    positions = {}
+    for sprite in sprites:
+        previous = previous_positions.get(sprite)
+        if previous is None:
+            continue
+        x, y = sprite.rect.topleft
+        positions[sprite] = (
+            round(previous[0] + (x - previous[0]) * alpha),
+            round(previous[1] + (y - previous[1]) * alpha),
+        )
+    return positions
@@ -0,0 +1,63 @@
+# Change-driven text rendering for the HUD and the end-of-game screens.
+#
+# Font rendering is one of the most expensive things a frame does, yet the
+# score changes a handful of times per game and the screen captions never
+# change at all. Labels only re-rasterise when their value changes and static
+# strings are rendered once; both report how much work they saved.
+_UNSET = object()
+
+
+class UiText:
+    def __init__(self):
+        self.static_surfaces = {}
+        self.renders = 0
+        self.skipped_renders = 0
+
+    def static(self, text, font, color):
+        # Surface for a string that never changes ("GAME OVER", prompts, ...)
+        key = (text, font, color)
+        surface = self.static_surfaces.get(key)
+        if surface is None:
+            surface = self._render(text, font, color)
+            self.static_surfaces[key] = surface
+        else:
+            self.skipped_renders += 1
+        return surface
+
+    def label(self, font, color, template="{}"):
+        return TextLabel(self, font, color, template)
+
+    def stats(self):
+        return {
+            "renders": self.renders,
+            "skipped_renders": self.skipped_renders,
+            "static_strings": len(self.static_surfaces),
+        }
+
+    def _render(self, text, font, color):
+        self.renders += 1
+        return font.render(text, True, color)
+
+
+class TextLabel:
+    # A line of text built from template.format(value), e.g. "Score: {}"
+    def __init__(self, ui, font, color, template="{}"):
+        self.ui = ui
+        self.font = font
+        self.color = color
+        self.template = template
+        self.value = _UNSET
+        self.surface = None
+        self.changed = False  # True if the last render() re-rasterised
+
+    def render(self, value):
+        if value == self.value and self.surface is not None:
+            self.ui.skipped_renders += 1
+            self.changed = False
+            return self.surface
+        self.value = value
+        self.surface = self.ui._render(
+            self.template.format(value), self.font, self.color
+        )
+        self.changed = True
+        return self.surface
@@ -0,0 +1,231 @@
+# Batched environment for training agents.
+#
+# VecEnv steps N independent headless engines (engine.Engine, so the same
+# Player / Number rules as the game) in lockstep inside one process and hands
+# back stacked NumPy arrays: one observation row, reward and done flag per
+# game. Finished games are reset on the spot with the next seed, so a
+# training loop can call step() forever.
+#
+#   env = VecEnv(64, seed=0)
+#   observations = env.reset()
+#   observations, rewards, dones, info = env.step(actions)  # actions: (64,)
+#
+# An action is a bit set: 1 jumps, 2 flips gravity, 3 does both. Observation
+# rows hold, as float32:
+#   player y (0 at the ceiling, 1 on the ground), vy, gravity direction
+#   (+1 / -1), flip charge (0 / 1), then for every number lane (top first)
+#   the NUMBERS_PER_LANE nearest numbers not yet past the player as
+#   (distance, is prime, present), then for each of the two powerup lanes the
+#   nearest powerup as (distance, present). Distances are from the player's
+#   right edge, in screen widths. Absent slots are all zero.
+#
+# The returned arrays are reused by the next step(); copy them to keep them.
+#
+#   python vec_env.py --envs 64 --steps 2000  # prints env-steps per second
+#
+# Needs NumPy, which is an optional dependency: `pip install .[frenzy]`.
+import argparse
+import sys
+import time
+
+import numpy as np
+import pygame
+
+import engine as game_engine
+from glyphs import GlyphCache
+from settings import (
+    CEILING_Y,
+    FONT_SIZE,
+    GROUND_Y,
+    NUMBER_LEVEL_BOTTOM_Y,
+    NUMBER_LEVEL_TOP_Y,
+    PLAYER_JUMP_STRENGTH_DOWN,
+    SCREEN_WIDTH,
+    TICKS_PER_SECOND,
+)
+
+JUMP_BIT = 1
+FLIP_BIT = 2
+# Engine actions for each action number (a JUMP_BIT | FLIP_BIT combination)
+ACTIONS = [
+    (),
+    (game_engine.JUMP,),
+    (game_engine.FLIP,),
+    (game_engine.JUMP, game_engine.FLIP),
+]
+
+NUMBERS_PER_LANE = 3
+POWERUP_LANE_YS = [NUMBER_LEVEL_TOP_Y, NUMBER_LEVEL_BOTTOM_Y]
+PLAYER_FIELDS = 4
+DEATH_REWARD = -100.0  # On top of the score change, when a game is lost
+DEFAULT_MAX_TICKS = TICKS_PER_SECOND * 600
+
+
+class VecEnv:
+    def __init__(
+        self,
+        num_envs,
+        seed=0,
+        rules=game_engine.DEFAULT_RULES,
+        max_ticks=DEFAULT_MAX_TICKS,
+        entity_store="sprites",
+        frenzy=False,
+    ):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(None, FONT_SIZE)
+        glyphs = GlyphCache()  # One font and glyph cache for every game
+        self.engines = [
+            game_engine.Engine(
+                rules=rules,
+                font=font,
+                glyphs=glyphs,
+                entity_store=entity_store,
+                frenzy=frenzy,
+            )
+            for _ in range(num_envs)
+        ]
+        self.num_envs = num_envs
+        self.max_ticks = max_ticks
+        self.next_seed = seed
+        self.lane_ys = list(self.engines[0].spawner.lane_ys)
+        self.observation_size = (
+            PLAYER_FIELDS
+            + len(self.lane_ys) * NUMBERS_PER_LANE * 3
+            + len(POWERUP_LANE_YS) * 2
+        )
+        self.observations = np.zeros((num_envs, self.observation_size), np.float32)
+        self.rewards = np.zeros(num_envs, np.float32)
+        self.dones = np.zeros(num_envs, bool)
+        # Outcome of the game each env last finished (or is playing)
+        self.scores = np.zeros(num_envs, np.int64)
+        self.wins = np.zeros(num_envs, bool)
+        self.ticks = np.zeros(num_envs, np.int64)
+        self.steps = 0
+        self.episodes = 0
+
+    def reset(self):
+        for i, engine in enumerate(self.engines):
+            self.reset_env(i, engine)
+        return self.observations
+
+    def reset_env(self, i, engine):
+        engine.reset(self.next_seed)
+        self.next_seed += 1
+        self.observe(i, engine)
+
+    def step(self, actions):
+        # actions: one action (0-3) per env. Returns (observations, rewards,
+        # dones, info); info holds the final score, win flag and length of
+        # every game that just ended.
+        rewards, dones = self.rewards, self.dones
+        max_ticks = self.max_ticks
+        for i, (engine, action) in enumerate(zip(self.engines, actions)):
+            score = engine.score
+            engine.step(ACTIONS[action])
+            reward = engine.score - score
+            if engine.game_over:
+                reward += DEATH_REWARD
+            rewards[i] = reward
+            done = not engine.running or engine.tick >= max_ticks
+            dones[i] = done
+            if done:
+                self.scores[i] = engine.score
+                self.wins[i] = engine.game_won
+                self.ticks[i] = engine.tick
+                self.episodes += 1
+                self.reset_env(i, engine)
+            else:
+                self.observe(i, engine)
+        self.steps += self.num_envs
+        info = {"scores": self.scores, "wins": self.wins, "ticks": self.ticks}
+        return self.observations, rewards, dones, info
+
+    def observe(self, i, engine):
+        row = self.observations[i]
+        row[:] = 0.0
+        player = engine.player
+        row[0] = (player.rect.top - CEILING_Y) / (
+            GROUND_Y - CEILING_Y - player.rect.height
+        )
+        row[1] = player.vy / PLAYER_JUMP_STRENGTH_DOWN
+        row[2] = engine.player_gravity_direction
+        row[3] = engine.has_gravity_flip_charge
+        left, right = player.rect.left, player.rect.right
+        offset = PLAYER_FIELDS
+        if engine.number_store is not None:
+            self.observe_store(row, engine.number_store, left, right)
+        else:
+            lanes = engine.number_lanes.lanes
+            for lane_y in self.lane_ys:
+                slot = offset
+                for number in lanes[lane_y]:
+                    if number.rect.right < left:
+                        continue  # Already past the player
+                    row[slot] = (number.rect.left - right) / SCREEN_WIDTH
+                    row[slot + 1] = number.is_prime_val
+                    row[slot + 2] = 1.0
+                    slot += 3
+                    if slot == offset + NUMBERS_PER_LANE * 3:
+                        break
+                offset += NUMBERS_PER_LANE * 3
+        offset = PLAYER_FIELDS + len(self.lane_ys) * NUMBERS_PER_LANE * 3
+        lanes = engine.powerup_lanes.lanes
+        for lane_y in POWERUP_LANE_YS:
+            for powerup in lanes[lane_y]:
+                if powerup.rect.right >= left:
+                    row[offset] = (powerup.rect.left - right) / SCREEN_WIDTH
+                    row[offset + 1] = 1.0
+                    break
+            offset += 2
+
+    def observe_store(self, row, store, left, right):
+        # The same number slots, from the struct-of-arrays store
+        n = store.count
+        x = store.x[:n]
+        ahead = np.flatnonzero(x + store.width[:n] >= left)
+        if not len(ahead):
+            return
+        lanes = store.lane[ahead]
+        order = np.lexsort((x[ahead], lanes))  # By lane, then nearest first
+        ahead, lanes = ahead[order], lanes[order]
+        starts = np.searchsorted(lanes, np.arange(len(self.lane_ys)))
+        ends = np.searchsorted(lanes, np.arange(len(self.lane_ys)), side="right")
+        for lane, (start, end) in enumerate(zip(starts, ends)):
+            nearest = ahead[start : min(end, start + NUMBERS_PER_LANE)]
+            k = len(nearest)
+            slots = row[PLAYER_FIELDS + lane * NUMBERS_PER_LANE * 3 :][: k * 3]
+            slots[0::3] = (x[nearest] - right) / SCREEN_WIDTH
+            slots[1::3] = store.prime[nearest]
+            slots[2::3] = 1.0
+
+
+def measure_throughput(env, steps, seed=0):
+    # Plays random actions (mostly idle) for steps batches; returns env-steps/s
+    rng = np.random.default_rng(seed)
+    env.reset()
+    started = time.perf_counter()
+    for _ in range(steps):
+        actions = rng.choice(len(ACTIONS), size=env.num_envs, p=[0.9, 0.05, 0.03, 0.02])
+        env.step(actions)
+    return steps * env.num_envs / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prime Porkour batched environment")
+    parser.add_argument("--envs", type=int, default=64, help="games stepped together")
+    parser.add_argument("--steps", type=int, default=2000, help="batches to step")
+    parser.add_argument("--seed", type=int, default=0, help="first game seed")
+    parser.add_argument("--frenzy", action="store_true", help="play frenzy games")
+    options = parser.parse_args(argv)
+    env = VecEnv(options.envs, seed=options.seed, frenzy=options.frenzy)
+    rate = measure_throughput(env, options.steps, options.seed)
+    print(
+        f"{options.envs} envs x {options.steps} steps: {rate:,.0f} env-steps/s "
+        f"({rate / TICKS_PER_SECOND:,.0f}x real time), {env.episodes} games finished"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())